@@ -1,5 +1,6 @@
 from logging.config import fileConfig
 from db.models import Base
+from db.db_connection import SYNC_DATABASE_URL
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
@@ -9,6 +10,10 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# migrate the database the app is configured for (DATABASE_URL) rather
+# than the placeholder URL in alembic.ini
+config.set_main_option("sqlalchemy.url", SYNC_DATABASE_URL.replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
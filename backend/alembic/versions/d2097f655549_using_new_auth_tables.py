@@ -132,3 +132,7 @@ def downgrade() -> None:
     op.drop_index(op.f('ix_users_email'), table_name='users')
     op.drop_table('users')
     # ### end Alembic commands ###
+    # drop_table leaves the PostgreSQL enum types create_table made
+    bind = op.get_bind()
+    for name in ('emailtaskstatus', 'emailjobstatus', 'email_provider_enum', 'source_type_enum'):
+        sa.Enum(name=name).drop(bind, checkfirst=True)
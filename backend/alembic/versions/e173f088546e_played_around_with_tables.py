@@ -11,6 +11,8 @@ from alembic import op
 import sqlalchemy as sa
 
 
+dataset_status_enum = sa.Enum('PROCESSING', 'COMPLETED', 'FAILED', name='status')
+
 # revision identifiers, used by Alembic.
 revision: str = 'e173f088546e'
 down_revision: Union[str, Sequence[str], None] = '328cb794a075'
@@ -33,7 +35,9 @@ def upgrade() -> None:
     sa.ForeignKeyConstraint(['job_id'], ['email_jobs.id'], ondelete='CASCADE'),
     sa.PrimaryKeyConstraint('id')
     )
-    op.add_column('datasets', sa.Column('dataset_status', sa.Enum('PROCESSING', 'COMPLETED', 'FAILED', name='status'), nullable=False))
+    # add_column doesn't emit CREATE TYPE on PostgreSQL
+    dataset_status_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column('datasets', sa.Column('dataset_status', dataset_status_enum, nullable=False))
     op.add_column('datasets', sa.Column('processed_rows', sa.Integer(), nullable=False))
     # ### end Alembic commands ###
 
@@ -43,5 +47,6 @@ def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column('datasets', 'processed_rows')
     op.drop_column('datasets', 'dataset_status')
+    dataset_status_enum.drop(op.get_bind(), checkfirst=True)
     op.drop_table('email_job_analytics')
     # ### end Alembic commands ###
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+
+# email_events.event_type -> EmailJobAnalytics counter column. "failed" is
+# recorded by the senders once a task runs out of retries, "dropped" by
+# SendGrid; "processed" is not counted, the sender already counted "sent".
+EVENT_COUNTERS = {
+    "sent": "sent_count",
+    "delivered": "delivered_count",
+    "open": "opened_count",
+    "click": "clicked_count",
+    "bounce": "bounced_count",
+    "dropped": "failed_count",
+    "failed": "failed_count",
+}
+
+COUNTER_COLUMNS = tuple(dict.fromkeys(EVENT_COUNTERS.values()))
+
+
+def count_events(events: list[tuple[int, str]]) -> Counter:
+    """Count ``(email_job_id, event_type)`` pairs as ``{(job_id, column): n}``."""
+    counts = Counter()
+    for job_id, event_type in events:
+        column = EVENT_COUNTERS.get(event_type)
+        if column:
+            counts[(job_id, column)] += 1
+    return counts
+
+
+class BaseAnalyticsBuffer(ABC):
+    """
+    Counter increments waiting to be written to email_job_analytics.
+
+    Senders and the webhook add to the buffer instead of updating the
+    job's analytics row themselves, so concurrent writers don't contend on
+    the same row and many increments become one UPDATE per job.
+    """
+
+    # True when the buffer only lives in the current process and has to
+    # be flushed by that process
+    local = False
+
+    @abstractmethod
+    def record(self, counts: Counter):
+        """Add ``{(job_id, column): n}`` increments."""
+
+    @abstractmethod
+    def drain(self) -> Counter:
+        """Remove and return everything buffered so far."""
@@ -0,0 +1,141 @@
+import logging
+import os
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from analytics.base import COUNTER_COLUMNS, BaseAnalyticsBuffer
+from analytics.memory import InMemoryAnalyticsBuffer
+from analytics.redis import RedisAnalyticsBuffer
+from db.db_connection import get_sync_db
+from db.db_models import EmailJobAnalytics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_BUFFER_BACKEND = os.getenv("ANALYTICS_BUFFER_BACKEND", "redis")
+ANALYTICS_REDIS_URL = os.getenv("ANALYTICS_REDIS_URL", "redis://localhost:6379/3")
+# Seconds between flushes of buffered counters to email_job_analytics
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "5"))
+
+_buffer: BaseAnalyticsBuffer | None = None
+_last_flush = time.monotonic()
+
+
+def get_analytics_buffer() -> BaseAnalyticsBuffer:
+    """Return the process wide buffer, falling back to memory if Redis is unreachable."""
+    global _buffer
+    if _buffer is not None:
+        return _buffer
+
+    if ANALYTICS_BUFFER_BACKEND == "redis":
+        try:
+            client = Redis.from_url(ANALYTICS_REDIS_URL)
+            client.ping()
+            _buffer = RedisAnalyticsBuffer(client)
+            return _buffer
+        except RedisError:
+            logger.warning(
+                "[ANALYTICS] Redis unavailable at %s, buffering counters in-process",
+                ANALYTICS_REDIS_URL,
+            )
+
+    _buffer = InMemoryAnalyticsBuffer()
+    return _buffer
+
+
+def apply_job_counts(db: Session, counts: Counter):
+    """
+    Add ``{(job_id, column): n}`` increments to email_job_analytics.
+
+    Increments are summed per job and written with one executemany of
+    ``col = col + :n``; jobs without an analytics row get one inserted.
+    """
+    per_job: dict[int, dict[str, int]] = {}
+    for (job_id, column), amount in counts.items():
+        if column in COUNTER_COLUMNS:
+            row = per_job.setdefault(job_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+            row[column] += amount
+    if not per_job:
+        return
+
+    existing = set(db.execute(
+        select(EmailJobAnalytics.job_id).where(EmailJobAnalytics.job_id.in_(per_job))
+    ).scalars())
+
+    missing = [
+        {"job_id": job_id, **row}
+        for job_id, row in per_job.items()
+        if job_id not in existing
+    ]
+    if missing:
+        db.execute(insert(EmailJobAnalytics), missing)
+
+    if existing:
+        table = EmailJobAnalytics.__table__
+        db.execute(
+            update(table)
+            .where(table.c.job_id == bindparam("b_job_id"))
+            .values({
+                column: table.c[column] + bindparam(f"b_{column}")
+                for column in COUNTER_COLUMNS
+            }),
+            [
+                {"b_job_id": job_id, **{f"b_{column}": row[column] for column in COUNTER_COLUMNS}}
+                for job_id, row in per_job.items()
+                if job_id in existing
+            ],
+        )
+
+
+def flush_job_analytics(buffer: BaseAnalyticsBuffer | None = None) -> int:
+    """Write everything buffered to email_job_analytics; return the number of jobs updated."""
+    global _last_flush
+    buffer = buffer or get_analytics_buffer()
+    _last_flush = time.monotonic()
+
+    counts = buffer.drain()
+    if not counts:
+        return 0
+
+    try:
+        with get_sync_db() as db:
+            apply_job_counts(db, counts)
+            db.commit()
+    except Exception:
+        # put the increments back so the next flush retries them
+        buffer.record(counts)
+        raise
+
+    return len({job_id for job_id, _ in counts})
+
+
+def record_job_counts(counts: Counter):
+    """
+    Buffer counter increments of committed events.
+
+    A shared (Redis) buffer is flushed by tasks.flush_job_analytics; an
+    in-process buffer is flushed here once ANALYTICS_FLUSH_INTERVAL has
+    passed, since no other process can see it.
+    """
+    if not counts:
+        return
+
+    buffer = get_analytics_buffer()
+    try:
+        buffer.record(counts)
+    except RedisError:
+        logger.exception("[ANALYTICS] Could not buffer %d counter increments", len(counts))
+        return
+
+    if buffer.local and time.monotonic() - _last_flush >= ANALYTICS_FLUSH_INTERVAL:
+        try:
+            flush_job_analytics(buffer)
+        except Exception:
+            logger.exception("[ANALYTICS] Flush failed, keeping counters buffered")
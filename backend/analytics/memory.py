@@ -0,0 +1,23 @@
+import threading
+from collections import Counter
+
+from analytics.base import BaseAnalyticsBuffer
+
+
+class InMemoryAnalyticsBuffer(BaseAnalyticsBuffer):
+    """Increments kept in the current process, flushed by the process that recorded them."""
+
+    local = True
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, counts: Counter):
+        with self._lock:
+            self._counts.update(counts)
+
+    def drain(self) -> Counter:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
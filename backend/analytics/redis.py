@@ -0,0 +1,40 @@
+from collections import Counter
+
+from redis import Redis
+
+from analytics.base import BaseAnalyticsBuffer
+
+PENDING_KEY = "analytics:pending"
+
+
+class RedisAnalyticsBuffer(BaseAnalyticsBuffer):
+    """
+    Increments shared by every worker in one Redis hash.
+
+    Fields are ``<job_id>:<column>``; HINCRBY makes recording atomic and
+    a MULTI of HGETALL + DEL drains the hash without losing increments
+    recorded concurrently.
+    """
+
+    def __init__(self, client: Redis):
+        self.client = client
+
+    def record(self, counts: Counter):
+        if not counts:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for (job_id, column), amount in counts.items():
+            pipe.hincrby(PENDING_KEY, f"{job_id}:{column}", amount)
+        pipe.execute()
+
+    def drain(self) -> Counter:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(PENDING_KEY)
+        pipe.delete(PENDING_KEY)
+        fields, _ = pipe.execute()
+
+        counts = Counter()
+        for field, amount in fields.items():
+            job_id, column = field.decode().split(":", 1)
+            counts[(int(job_id), column)] += int(amount)
+        return counts
@@ -1,11 +1,17 @@
 # celery_app.py
+import os
 from celery import Celery
+from celery.schedules import crontab
+from dotenv import load_dotenv
+
+# beat reads DISPATCHER_MODE and the schedule intervals below from .env
+load_dotenv()
 
 celery_app = Celery(
     "email_sender",
     broker="redis://localhost:6379/0",
     backend="redis://localhost:6379/1",
-        include=["tasks.email_tasks"],  # <-- THIS is the key line
+        include=["tasks.email_tasks", "tasks.process_csv", "tasks.materialize", "tasks.event_archive", "tasks.job_analytics", "tasks.sendgrid_events", "tasks.lease_reaper"],  # <-- THIS is the key line
 
 )
 
@@ -17,12 +23,40 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     worker_prefetch_multiplier=1,
+    # CSV ingestion and task materialization are CPU bound, keep them off
+    # the workers that send emails
+    task_routes={
+        "tasks.*dataset*": {"queue": "datasets"},
+        "tasks.materialize_email_job": {"queue": "datasets"},
+        "tasks.archive_email_events": {"queue": "datasets"},
+        "tasks.rebuild_job_analytics": {"queue": "datasets"},
+        # webhook batches queued by sendgrid_webhook in queue mode
+        "tasks.ingest_sendgrid_events": {"queue": "webhooks"},
+    },
 )
 
 celery_app.conf.beat_schedule = {
-    "dispatch-emails-every-10-seconds": {
+    "flush-job-analytics": {
+        "task": "tasks.flush_job_analytics",
+        "schedule": float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "5")),
+        "options": {"queue": "emails"},
+    },
+    "archive-email-events-daily": {
+        "task": "tasks.archive_email_events",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "reap-expired-leases": {
+        "task": "tasks.reap_expired_leases",
+        "schedule": float(os.getenv("TASK_REAPER_INTERVAL", "60")),
+        # workers run with -Q emails, the default queue has no consumer
+        "options": {"queue": "emails"},
+    },
+}
+
+# DISPATCHER_MODE=service replaces the poll with python -m dispatcher.service
+if os.getenv("DISPATCHER_MODE", "beat") == "beat":
+    celery_app.conf.beat_schedule["dispatch-emails-every-10-seconds"] = {
         "task": "tasks.dispatch_emails",
         "schedule": 1.0,   # seconds
         "options": {"queue": "emails"},
     }
-}
@@ -6,14 +6,17 @@ from .models.enums import (
     EmailProvider,
     EmailJobStatus,
     EmailTaskStatus,
-    DatasetStatus
+    DatasetStatus,
+    DatasetStorageFormat,
 )
 from .models.user import User
-from .models.dataset import Dataset, DatasetRow
+from .models.dataset import Dataset, DatasetRow, DatasetIngestChunk
 from .models.email_account import EmailAccount
 from .models.email_job import EmailJob
 from .models.email_task import EmailTask
 from .models.email_event import EmailEvent
+from .models.email_event_aggregate import EmailEventAggregate
+from .models.email_job_analytics import EmailJobAnalytics
 
 
 __all__ = [
@@ -25,10 +28,14 @@ __all__ = [
     "User",
     "Dataset",
     "DatasetRow",
+    "DatasetIngestChunk",
     "EmailAccount",
     "EmailJob",
     "EmailTask",
     "EmailEvent",
-    "DatasetStatus"
+    "EmailEventAggregate",
+    "EmailJobAnalytics",
+    "DatasetStatus",
+    "DatasetStorageFormat",
 ]
 
@@ -0,0 +1,140 @@
+"""
+EXPLAIN the hot queries and fail if any of them plans a full table scan,
+or does not use the index it was designed around.
+
+    python -m db.explain_hot_queries
+
+Runs against the configured DATABASE_URL, which must be migrated to head.
+On PostgreSQL sequential scans are disabled for the EXPLAIN so the check
+does not depend on how much data is seeded: a Seq Scan in the plan then
+means no index can serve the query. Exits non-zero on a regression, so it
+can gate schema changes in CI.
+"""
+
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from db.db_connection import sync_engine
+from db.db_models import (
+    Dataset,
+    DatasetRow,
+    EmailAccount,
+    EmailEvent,
+    EmailTask,
+)
+from tasks.email_tasks import pending_heads
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+
+# queries that must be served by one particular index
+EXPECTED_INDEXES = {
+    "claim pending tasks": "ix_email_tasks_job_id_status_id",
+}
+
+HOT_TABLES = {
+    model.__tablename__
+    for model in (Dataset, DatasetRow, EmailAccount, EmailEvent, EmailTask)
+}
+
+
+def hot_queries() -> dict[str, Select]:
+    return {
+        # tasks.email_tasks.claim_pending_tasks
+        "claim pending tasks": select(pending_heads({1: 10, 2: 10}).c.id),
+        # sent counts of a job over a time window
+        "sent events of a job": (
+            select(func.count())
+            .select_from(EmailEvent)
+            .where(
+                EmailEvent.email_job_id == 1,
+                EmailEvent.event_type == "sent",
+                EmailEvent.created_at >= datetime.utcnow() - timedelta(days=1),
+            )
+        ),
+        # routes.dataset.list_datasets
+        "datasets of a user": (
+            select(Dataset.id)
+            .where(Dataset.user_id == uuid.UUID(int=1))
+            .order_by(Dataset.created_at.desc())
+            .limit(10)
+        ),
+        # routes.auth.issue_client_token
+        "account by oauth_id": select(EmailAccount.id).where(
+            EmailAccount.oauth_id == "client-id"
+        ),
+        # tasks.materialize.materialize_email_job
+        "dataset rows page": (
+            select(DatasetRow.id, DatasetRow.row_data)
+            .where(DatasetRow.dataset_id == 1, DatasetRow.id > 0)
+            .order_by(DatasetRow.id)
+            .limit(5000)
+        ),
+    }
+
+
+def _compile(conn: Connection, stmt: Select) -> str:
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _postgresql_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(_postgresql_scans(child))
+    return scans
+
+
+def full_scans(conn: Connection, stmt: Select) -> tuple[list[str], list[str]]:
+    """Return ``(tables scanned in full, plan lines)`` of a statement."""
+    sql = _compile(conn, stmt)
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+        lines = conn.execute(text(f"EXPLAIN {sql}")).scalars().all()
+        return _postgresql_scans(plan), lines
+
+    lines = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    scans = [
+        match.group(1)
+        for line in lines
+        if (match := SQLITE_SCAN.match(line)) and match.group(1) in HOT_TABLES
+    ]
+    return scans, lines
+
+
+def main() -> int:
+    failed = False
+
+    with sync_engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            with conn.begin():
+                scans, lines = full_scans(conn, stmt)
+
+            expected = EXPECTED_INDEXES.get(name)
+            wrong_index = expected is not None and not any(expected in line for line in lines)
+
+            status = "FULL SCAN" if scans else "INDEX" if wrong_index else "ok"
+            print(f"{status:<9} {name}")
+            for line in lines:
+                print(f"          {line}")
+
+            if scans:
+                failed = True
+                print(f"          full scan of {', '.join(scans)}")
+            if wrong_index:
+                failed = True
+                print(f"          expected {expected} in the plan")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@ from .enums import (
     EmailProvider,
     EmailJobStatus,
     EmailTaskStatus,
+    DatasetStorageFormat,
 )
 
 # Base
@@ -11,11 +12,12 @@ from .base import Base
 
 # Models
 from .user import User
-from .dataset import Dataset, DatasetRow
+from .dataset import Dataset, DatasetRow, DatasetIngestChunk
 from .email_account import EmailAccount
 from .email_job import EmailJob
 from .email_task import EmailTask
 from .email_event import EmailEvent
+from .email_event_aggregate import EmailEventAggregate
 from .email_job_analytics import EmailJobAnalytics
 
 __all__ = [
@@ -24,16 +26,19 @@ __all__ = [
     "EmailProvider",
     "EmailJobStatus",
     "EmailTaskStatus",
+    "DatasetStorageFormat",
     # Base
     "Base",
     # Models
     "User",
     "Dataset",
     "DatasetRow",
+    "DatasetIngestChunk",
     "EmailAccount",
     "EmailJob",
     "EmailTask",
     "EmailEvent",
+    "EmailEventAggregate",
     "EmailJobAnalytics"
 ]
 
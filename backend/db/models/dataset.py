@@ -1,9 +1,10 @@
 from datetime import datetime
-from sqlalchemy import Enum, JSON, DateTime, ForeignKey, String
+from typing import Optional
+from sqlalchemy import BigInteger, Enum, JSON, DateTime, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
-from .enums import SourceType,DatasetStatus
+from .enums import SourceType,DatasetStatus,DatasetStorageFormat
 
 
 class Dataset(Base):
@@ -23,7 +24,6 @@ class Dataset(Base):
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     json_schema: Mapped[list[str]] = mapped_column(
         JSON,
@@ -36,14 +36,79 @@ class Dataset(Base):
     )
     email_column: Mapped[str] = mapped_column(nullable=False)
     processed_rows:Mapped[int] = mapped_column(default=0)
+    storage_format: Mapped[DatasetStorageFormat] = mapped_column(
+        Enum(DatasetStorageFormat, name="dataset_storage_format_enum"),
+        nullable=False,
+        default=DatasetStorageFormat.JSON,
+        server_default=DatasetStorageFormat.JSON.name,
+    )
+
+    __table_args__ = (
+        # a user's datasets, newest first
+        Index("ix_datasets_user_id_created_at", "user_id", "created_at"),
+    )
+
+    def encode_row(self, values: list[str]) -> dict | list:
+        """Build ``DatasetRow.row_data`` from values ordered like ``json_schema``."""
+        if self.storage_format == DatasetStorageFormat.ARRAY:
+            return values
+        return dict(zip(self.json_schema, values))
+
+    def decode_row(self, row_data: dict | list) -> dict:
+        """Return a stored ``DatasetRow.row_data`` as a {column: value} dict."""
+        if isinstance(row_data, list):
+            return dict(zip(self.json_schema, row_data))
+        return row_data
+
+    def decode_columns(self, rows: list[dict | list]) -> dict[str, list]:
+        """Return stored ``row_data`` values as {column: [value per row]}."""
+        if self.storage_format == DatasetStorageFormat.ARRAY:
+            # positional rows transpose in one zip
+            values = list(zip(*rows)) or [()] * len(self.json_schema)
+            return dict(zip(self.json_schema, values))
+        return {
+            column: [row.get(column, "") for row in rows]
+            for column in self.json_schema
+        }
 
 
 class DatasetRow(Base):
     __tablename__ = "dataset_rows"
     
+    id: Mapped[int] = mapped_column(primary_key=True)
+    dataset_id: Mapped[int] = mapped_column(
+        ForeignKey("datasets.id", ondelete="CASCADE")
+    )
+    # layout depends on Dataset.storage_format, read it through Dataset.decode_row
+    row_data: Mapped[dict | list] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (
+        # rows of a dataset in id order (keyset pagination)
+        Index("ix_dataset_rows_dataset_id_id", "dataset_id", "id"),
+    )
+
+
+
+class DatasetIngestChunk(Base):
+    """
+    A byte range of an uploaded CSV ingested by one worker task.
+
+    Rows of a chunk are inserted in the same transaction that sets
+    ``completed_at``, so a chunk is either fully ingested or not at all
+    and an interrupted ingestion can resume from the unfinished chunks.
+    """
+    __tablename__ = "dataset_ingest_chunks"
+
     id: Mapped[int] = mapped_column(primary_key=True)
     dataset_id: Mapped[int] = mapped_column(
         ForeignKey("datasets.id", ondelete="CASCADE"), index=True
     )
-    row_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    chunk_index: Mapped[int] = mapped_column(nullable=False)
+    start_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    end_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    rows: Mapped[int] = mapped_column(default=0)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "chunk_index", name="uq_dataset_chunk"),
+    )
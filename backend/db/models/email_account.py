@@ -56,7 +56,9 @@ class EmailAccount(Base):
     oauth_id:Mapped[str] = mapped_column(
         String,
         default=None,
-        nullable=True
+        nullable=True,
+        unique=True,
+        index=True,
     ) 
     
     @property
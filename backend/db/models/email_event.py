@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy import JSON, DateTime, ForeignKey, String
+from typing import Optional
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -19,10 +20,11 @@ class EmailEvent(Base):
     email_job_id: Mapped[int] = mapped_column(
         ForeignKey("email_jobs.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     event_type: Mapped[str] = mapped_column(String, nullable=False)
+    # sg_event_id of webhook events, used to drop redelivered events
+    provider_event_id: Mapped[Optional[str]] = mapped_column(String, unique=True, index=True)
     payload: Mapped[dict] = mapped_column(JSON, nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
@@ -31,3 +33,12 @@ class EmailEvent(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # event counts of a job per type and time range
+        Index(
+            "ix_email_events_job_id_event_type_created_at",
+            "email_job_id",
+            "event_type",
+            "created_at",
+        ),
+    )
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from sqlalchemy import Date, DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class EmailEventAggregate(Base):
+    """
+    Daily per job counts of email_events that were archived.
+
+    Raw events older than the retention window are compacted into these
+    rows and moved out of the database, so per job event counts are the
+    sum of the aggregates plus the events still in email_events.
+    """
+
+    __tablename__ = "email_event_aggregates"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    email_job_id: Mapped[int] = mapped_column(
+        ForeignKey("email_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    count: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    first_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "email_job_id",
+            "event_type",
+            "day",
+            name="uq_event_aggregate_job_type_day",
+        ),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Enum, DateTime, ForeignKey
+from sqlalchemy import Enum, DateTime, ForeignKey, Index, false
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -37,6 +37,18 @@ class EmailJob(Base):
 
     scheduled_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     throttle_per_minute: Mapped[int] = mapped_column(default=60, nullable=False)
+    # weight in the dispatcher's fair sharing between users and accounts;
+    # a job with priority 2 gets twice the share of one with priority 1
+    priority: Mapped[int] = mapped_column(default=1, server_default="1", nullable=False)
+
+    # render subject/body in the sender instead of storing them per task
+    lazy_render: Mapped[bool] = mapped_column(
+        default=False, server_default=false(), nullable=False
+    )
+
+    # set once every EmailTask of the job has been created by
+    # tasks.materialize_email_job; the dispatcher may send before that
+    materialized_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
@@ -44,3 +56,8 @@ class EmailJob(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # the dispatcher reads RUNNING jobs every tick and rebuilds its
+        # schedule index from the SCHEDULED ones
+        Index("ix_email_jobs_status_scheduled_at", "status", "scheduled_at"),
+    )
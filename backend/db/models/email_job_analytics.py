@@ -6,7 +6,12 @@ from .base import Base
 class EmailJobAnalytics(Base):
     __tablename__ = "email_job_analytics"
     id: Mapped[int] = mapped_column(primary_key=True)
-    job_id: Mapped[int] = mapped_column(ForeignKey("email_jobs.id", ondelete="CASCADE"))
+    # one row per job, written by analytics.factory.apply_job_counts
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("email_jobs.id", ondelete="CASCADE"),
+        unique=True,
+        index=True,
+    )
     sent_count: Mapped[int] = mapped_column(default=0)
     delivered_count: Mapped[int] = mapped_column(default=0)
     opened_count: Mapped[int] = mapped_column(default=0)
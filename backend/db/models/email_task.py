@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Enum, DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy import Enum, DateTime, ForeignKey, Index, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -15,7 +15,6 @@ class EmailTask(Base):
     job_id: Mapped[int] = mapped_column(
         ForeignKey("email_jobs.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     dataset_row_id: Mapped[int] = mapped_column(
@@ -38,9 +37,27 @@ class EmailTask(Base):
     )
 
     error: Mapped[Optional[str]] = mapped_column(String)
+    # sg_message_id reported by the SendGrid event webhook
+    provider_message_id: Mapped[Optional[str]] = mapped_column(String)
     sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    
+
+    # worker sending an IN_PROGRESS task, NULL while its message is queued
+    claimed_by: Mapped[Optional[str]] = mapped_column(String)
+    # an IN_PROGRESS task whose lease runs out is requeued by
+    # tasks.reap_expired_leases; senders extend it while they work
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
     __table_args__ = (
         UniqueConstraint("job_id", "dataset_row_id", name="uq_job_row"),
+        # tasks of a job by status in id order: serves the dispatcher's
+        # claim (first PENDING ids of a job) and lookups by job_id
+        Index("ix_email_tasks_job_id_status_id", "job_id", "status", "id"),
+        # the reaper only ever reads IN_PROGRESS tasks by lease expiry
+        Index(
+            "ix_email_tasks_in_progress_lease",
+            "lease_expires_at",
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+            sqlite_where=text("status = 'IN_PROGRESS'"),
+        ),
     )
 
@@ -6,6 +6,11 @@ class DatasetStatus(enum.Enum):
     FAILED="failed"
 
 
+class DatasetStorageFormat(enum.Enum):
+    JSON = "json"      # each row is a {column: value} object
+    ARRAY = "array"    # each row is a list of values ordered like Dataset.json_schema
+
+
 class SourceType(enum.Enum):
     GSHEET = 'gsheet'
     CSV = 'csv'
@@ -0,0 +1,129 @@
+"""
+Weighted fair sharing of dispatch capacity across tenants.
+
+Jobs are grouped by user, then by sending account within a user. At each
+level capacity is split max-min fairly by weight, so a user with one
+huge campaign gets the same share as a user with a small one, and the
+small one's unused share goes back to the others. A job's weight is its
+``EmailJob.priority``; a user or account weighs as much as its highest
+priority job, so splitting a campaign into many jobs doesn't buy a
+bigger share.
+"""
+
+import heapq
+import random
+from collections import defaultdict
+from typing import Hashable, Sequence
+
+
+def weighted_shares(
+    demands: dict[Hashable, int],
+    weights: dict[Hashable, float],
+    capacity: int,
+) -> dict[Hashable, int]:
+    """
+    Split ``capacity`` between keys by weight, never above their demand.
+
+    Water-filling: every round hands each unsatisfied key its weighted
+    part of what is left (at least one), until demand or capacity runs
+    out. Keys are visited in random order so rounding leftovers, and a
+    capacity smaller than the number of keys, don't always favour the
+    same tenants.
+    """
+    shares = {key: 0 for key in demands}
+    active = [key for key, demand in demands.items() if demand > 0]
+    remaining = capacity
+
+    while active and remaining > 0:
+        random.shuffle(active)
+        total_weight = sum(weights[key] for key in active)
+        granted = 0
+        for key in active:
+            part = max(1, int(remaining * weights[key] / total_weight))
+            part = min(part, demands[key] - shares[key], remaining - granted)
+            shares[key] += part
+            granted += part
+            if granted == remaining:
+                break
+        remaining -= granted
+        active = [key for key in active if shares[key] < demands[key]]
+
+    return shares
+
+
+def _group(job_ids, paths: dict[int, Sequence], level: int) -> dict[Hashable, list[int]]:
+    groups = defaultdict(list)
+    for job_id in job_ids:
+        groups[paths[job_id][level]].append(job_id)
+    return groups
+
+
+def fair_budgets(
+    budgets: dict[int, int],
+    paths: dict[int, Sequence],
+    weights: dict[int, float],
+    capacity: int,
+    level: int = 0,
+) -> dict[int, int]:
+    """
+    Split ``capacity`` between jobs wanting ``budgets[job_id]`` tasks.
+
+    ``paths[job_id]`` is the job's tenant path, ``(user_id,
+    email_account_id)``; capacity is shared fairly at each level of it
+    in turn and finally between the jobs of one account.
+    """
+    if level == len(next(iter(paths.values()), ())):
+        return weighted_shares(budgets, weights, capacity)
+
+    groups = _group(budgets, paths, level)
+    group_shares = weighted_shares(
+        {key: sum(budgets[job_id] for job_id in members) for key, members in groups.items()},
+        {key: max(weights[job_id] for job_id in members) for key, members in groups.items()},
+        capacity,
+    )
+
+    shares = {}
+    for key, members in groups.items():
+        shares.update(fair_budgets(
+            {job_id: budgets[job_id] for job_id in members},
+            paths,
+            weights,
+            group_shares[key],
+            level + 1,
+        ))
+    return shares
+
+
+def _merge(sequences: dict[Hashable, list], weights: dict[Hashable, float]) -> list:
+    """Merge sequences by virtual finish time: item ``i`` of ``key`` finishes at ``(i + 1) / weight``."""
+    tagged = [
+        [((position + 1) / weights[key], order, item) for position, item in enumerate(sequence)]
+        for order, (key, sequence) in enumerate(sequences.items())
+    ]
+    return [item for _, _, item in heapq.merge(*tagged)]
+
+
+def interleave(
+    items: dict[int, list],
+    paths: dict[int, Sequence],
+    weights: dict[int, float],
+    level: int = 0,
+) -> list:
+    """
+    Order every job's ``items`` (e.g. send batches) so tenants alternate.
+
+    Weighted fair queuing at each level of the tenant path: a user with
+    a thousand batches queued and a user with two both get their first
+    batch near the front.
+    """
+    if level == len(next(iter(paths.values()), ())):
+        return _merge(items, weights)
+
+    groups = _group(items, paths, level)
+    return _merge(
+        {
+            key: interleave({job_id: items[job_id] for job_id in members}, paths, weights, level + 1)
+            for key, members in groups.items()
+        },
+        {key: max(weights[job_id] for job_id in members) for key, members in groups.items()},
+    )
@@ -0,0 +1,69 @@
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between dispatch latency summaries in the log
+DISPATCH_METRICS_INTERVAL = float(os.getenv("DISPATCH_METRICS_INTERVAL", "60"))
+
+
+class LatencyRecorder:
+    """
+    Recent latency samples of one process, summarized into the log.
+
+    Kept small and in-process on purpose: the beat task and the
+    dispatcher service log the same summary, so the two can be compared
+    by reading their logs side by side.
+    """
+
+    def __init__(self, name: str, size: int = 10000):
+        self.name = name
+        self.samples: deque[float] = deque(maxlen=size)
+        self._last_log = time.monotonic()
+
+    def record(self, now: datetime, since: datetime | None):
+        if since is not None:
+            self.samples.append(max(0.0, (now - since).total_seconds()))
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": 0}
+
+        def percentile(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "count": len(ordered),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": ordered[-1],
+        }
+
+    def maybe_log(self):
+        if time.monotonic() - self._last_log < DISPATCH_METRICS_INTERVAL:
+            return
+        self._last_log = time.monotonic()
+
+        summary = self.summary()
+        if summary["count"]:
+            logger.info(
+                "[METRICS] %s n=%d p50=%.3fs p95=%.3fs max=%.3fs",
+                self.name,
+                summary["count"],
+                summary["p50"],
+                summary["p95"],
+                summary["max"],
+            )
+        self.samples.clear()
+
+
+# time from a job becoming eligible to the dispatcher picking it up
+dispatch_latency = LatencyRecorder("dispatch_latency")
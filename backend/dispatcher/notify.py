@@ -0,0 +1,52 @@
+import logging
+import os
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.exceptions import RedisError
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "beat" polls tasks.dispatch_emails every second, "service" runs the
+# event-driven dispatcher (python -m dispatcher.service) instead
+DISPATCHER_MODE = os.getenv("DISPATCHER_MODE", "beat")
+DISPATCHER_REDIS_URL = os.getenv("DISPATCHER_REDIS_URL", "redis://localhost:6379/4")
+
+WAKEUP_CHANNEL = "dispatcher:wakeup"
+
+_client: Redis | None = None
+
+
+def dispatcher_redis() -> Redis:
+    global _client
+    if _client is None:
+        _client = Redis.from_url(DISPATCHER_REDIS_URL)
+    return _client
+
+
+def notify_dispatcher(reason: str, job_id: int | None = None):
+    """
+    Wake the dispatcher service because new work may be eligible.
+
+    Pass ``job_id`` when a job was created or its schedule changed, so the
+    service reloads it into its schedule index. Best effort: a lost
+    notification only delays dispatch until the service's next timed
+    wakeup or index resync. Does nothing in beat mode.
+    """
+    if DISPATCHER_MODE != "service":
+        return
+    message = reason if job_id is None else f"{reason}:{job_id}"
+    try:
+        dispatcher_redis().publish(WAKEUP_CHANNEL, message)
+    except RedisError:
+        logger.warning("[DISPATCHER] Could not publish wakeup (%s)", reason)
+
+
+def notified_job_id(message: bytes | str) -> int | None:
+    """The job id carried by a wakeup message, if any."""
+    if isinstance(message, bytes):
+        message = message.decode()
+    _, _, job_id = message.partition(":")
+    return int(job_id) if job_id.isdigit() else None
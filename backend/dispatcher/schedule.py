@@ -0,0 +1,79 @@
+import heapq
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.db_models import EmailJob, EmailJobStatus
+
+
+class ScheduleIndex:
+    """
+    Min-heap of SCHEDULED jobs keyed by ``scheduled_at``.
+
+    Lets the dispatcher service find the jobs that just became eligible,
+    and the time of its next wakeup, in O(log n) instead of filtering the
+    email_jobs table every tick. Rescheduling a job pushes a new entry;
+    the old one is skipped when it reaches the top (lazy deletion), so
+    every operation stays O(log n).
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        self._entries: dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, job_id: int, scheduled_at: datetime | None):
+        """Insert or reschedule a job; no ``scheduled_at`` means due now."""
+        scheduled_at = scheduled_at or datetime.min
+        if self._entries.get(job_id) == scheduled_at:
+            return
+        self._entries[job_id] = scheduled_at
+        heapq.heappush(self._heap, (scheduled_at, job_id))
+
+    def remove(self, job_id: int):
+        self._entries.pop(job_id, None)
+
+    def _drop_stale(self):
+        while self._heap:
+            scheduled_at, job_id = self._heap[0]
+            if self._entries.get(job_id) == scheduled_at:
+                return
+            heapq.heappop(self._heap)
+
+    def next_at(self) -> datetime | None:
+        """When the earliest job becomes eligible, None when nothing is scheduled."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> set[int]:
+        """Remove and return the jobs whose scheduled time has been reached."""
+        due = set()
+        while (next_at := self.next_at()) is not None and next_at <= now:
+            _, job_id = heapq.heappop(self._heap)
+            del self._entries[job_id]
+            due.add(job_id)
+        return due
+
+    def sync(self, db: Session, job_ids: set[int] | None = None):
+        """
+        Refresh entries from the database.
+
+        Reloads the given jobs (after a notification), or every SCHEDULED
+        job when ``job_ids`` is None, which also rebuilds the heap.
+        """
+        query = select(EmailJob.id, EmailJob.scheduled_at).where(
+            EmailJob.status == EmailJobStatus.SCHEDULED
+        )
+        if job_ids is None:
+            self._heap = []
+            self._entries = {}
+        else:
+            query = query.where(EmailJob.id.in_(job_ids))
+            for job_id in job_ids:
+                self.remove(job_id)
+
+        for job_id, scheduled_at in db.execute(query):
+            self.add(job_id, scheduled_at)
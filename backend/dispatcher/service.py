@@ -0,0 +1,165 @@
+"""
+Event-driven dispatcher, run instead of the 1 second beat poll.
+
+    DISPATCHER_MODE=service python -m dispatcher.service
+
+Any number of instances can run; a Redis lock elects the one that
+dispatches. The leader runs a tick when it is notified (job created, new
+tasks materialized, tasks requeued), when a throttled job's next token is
+due, when the next scheduled job becomes eligible, and otherwise backs
+off exponentially while idle.
+
+Scheduled jobs are tracked in an in-memory ScheduleIndex, rebuilt from the
+database when leadership is taken and every DISPATCHER_RESYNC_INTERVAL
+seconds, and updated from the job ids carried by wakeup notifications.
+"""
+
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.exceptions import LockError, RedisError
+
+from db.db_connection import get_sync_db
+from dispatcher.notify import WAKEUP_CHANNEL, dispatcher_redis, notified_job_id
+from dispatcher.schedule import ScheduleIndex
+from tasks.email_tasks import run_dispatch
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "dispatcher:leader"
+# Seconds the leader lock lives without being renewed
+DISPATCHER_LOCK_TTL = float(os.getenv("DISPATCHER_LOCK_TTL", "15"))
+# Idle wait doubles from the minimum up to the maximum while nothing is dispatched
+DISPATCHER_IDLE_MIN = float(os.getenv("DISPATCHER_IDLE_MIN", "0.5"))
+DISPATCHER_IDLE_MAX = float(os.getenv("DISPATCHER_IDLE_MAX", "30"))
+# Seconds between full rebuilds of the schedule index, the safety net for
+# lost notifications and jobs changed without one
+DISPATCHER_RESYNC_INTERVAL = float(os.getenv("DISPATCHER_RESYNC_INTERVAL", "300"))
+
+
+class DispatcherService:
+
+    def __init__(self, client: Redis):
+        self.client = client
+        self.lock = client.lock(LEADER_KEY, timeout=DISPATCHER_LOCK_TTL, thread_local=False)
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(WAKEUP_CHANNEL)
+        self.idle_wait = DISPATCHER_IDLE_MIN
+        self.running = True
+        self.schedule = ScheduleIndex()
+        # jobs to reload into the schedule index, from notifications
+        self.changed_jobs: set[int] = set()
+        self.synced_at: float | None = None
+
+    def is_leader(self) -> bool:
+        """Renew the leader lock if held, otherwise try to take it."""
+        try:
+            if self.lock.owned():
+                self.lock.reacquire()
+                return True
+            if self.lock.acquire(blocking=False):
+                logger.info("[DISPATCHER] Became leader")
+                # jobs may have changed while another instance led
+                self.synced_at = None
+                return True
+        except LockError:
+            logger.warning("[DISPATCHER] Lost leadership")
+        return False
+
+    def tick(self) -> float:
+        """Dispatch once; return how long to sleep unless notified sooner."""
+        self.sync_schedule()
+        now = datetime.utcnow()
+        due = self.schedule.pop_due(now)
+        try:
+            result = run_dispatch(now, due)
+        except Exception:
+            # the popped jobs were not dispatched, rebuild to get them back
+            self.synced_at = None
+            raise
+
+        if result.claimed:
+            self.idle_wait = DISPATCHER_IDLE_MIN
+        else:
+            self.idle_wait = min(self.idle_wait * 2, DISPATCHER_IDLE_MAX)
+
+        waits = [self.idle_wait]
+        if result.next_refill is not None:
+            waits.append(result.next_refill)
+        next_scheduled = self.schedule.next_at()
+        if next_scheduled is not None:
+            waits.append(max(0.0, (next_scheduled - now).total_seconds()))
+        return min(waits)
+
+    def sync_schedule(self):
+        """Rebuild the schedule index when due, otherwise reload notified jobs."""
+        if (
+            self.synced_at is None
+            or time.monotonic() - self.synced_at >= DISPATCHER_RESYNC_INTERVAL
+        ):
+            self.changed_jobs.clear()
+            with get_sync_db() as db:
+                self.schedule.sync(db)
+            self.synced_at = time.monotonic()
+            logger.info("[DISPATCHER] Schedule index rebuilt with %d jobs", len(self.schedule))
+        elif self.changed_jobs:
+            changed, self.changed_jobs = self.changed_jobs, set()
+            with get_sync_db() as db:
+                self.schedule.sync(db, changed)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a notification or ``timeout``; return True if notified."""
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return False
+        # coalesce a burst of notifications into one tick
+        while message is not None:
+            job_id = notified_job_id(message["data"])
+            if job_id is not None:
+                self.changed_jobs.add(job_id)
+            message = self.pubsub.get_message(timeout=0)
+        self.idle_wait = DISPATCHER_IDLE_MIN
+        return True
+
+    def stop(self, *args):
+        self.running = False
+
+    def run(self):
+        # the lock has to be renewed well before it expires
+        renew_every = DISPATCHER_LOCK_TTL / 3
+
+        try:
+            while self.running:
+                try:
+                    if not self.is_leader():
+                        self.wait(renew_every)
+                        continue
+                    self.wait(min(self.tick(), renew_every))
+                except RedisError:
+                    logger.exception("[DISPATCHER] Redis error, retrying")
+                    time.sleep(1)
+                except Exception:
+                    logger.exception("[DISPATCHER] Tick failed")
+                    time.sleep(1)
+        finally:
+            try:
+                if self.lock.owned():
+                    self.lock.release()
+            except (LockError, RedisError):
+                pass
+            self.pubsub.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    service = DispatcherService(dispatcher_redis())
+    signal.signal(signal.SIGTERM, service.stop)
+    signal.signal(signal.SIGINT, service.stop)
+    service.run()
@@ -1,6 +1,13 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
+
+import httpx
+
 from db.db_models import EmailAccount,EmailTask
 
+logger = logging.getLogger(__name__)
+
 
 class BaseEmailProviderAdapter(ABC):
     def __init__(self, account: EmailAccount):
@@ -10,3 +17,65 @@ class BaseEmailProviderAdapter(ABC):
     @abstractmethod
     def send(self, task: EmailTask):
         ...
+
+    def send_many(self, tasks: list[EmailTask]) -> dict[int, Exception]:
+        """
+        Send several tasks and return the errors keyed by task id.
+
+        Providers with a bulk API override this; the default sends one
+        message per task through ``send``.
+        """
+        errors = {}
+        for task in tasks:
+            try:
+                self.send(task)
+            except Exception as exc:
+                logger.exception(
+                    "[SENDER] Error sending task_id=%s recipient=%s",
+                    task.id,
+                    task.recipient_email,
+                )
+                errors[task.id] = exc
+        return errors
+
+    def is_expired(self) -> bool:
+        """Whether cached clients/credentials can no longer be reused."""
+        return False
+
+
+class AsyncBaseEmailProviderAdapter(ABC):
+    """
+    Async counterpart of BaseEmailProviderAdapter.
+
+    Adapters talk to the provider's HTTP API through a shared
+    ``httpx.AsyncClient`` so connections are kept alive and pooled
+    across sends.
+    """
+
+    def __init__(self, account: EmailAccount, client: httpx.AsyncClient):
+        self.account = account
+        self.secrets = account.config
+        self.client = client
+
+    @abstractmethod
+    async def send(self, task: EmailTask):
+        ...
+
+    async def send_many(self, tasks: list[EmailTask], limit: asyncio.Semaphore) -> dict[int, Exception]:
+        """Send tasks concurrently, holding ``limit`` for every request; return errors keyed by task id."""
+        errors = {}
+
+        async def send_one(task: EmailTask):
+            async with limit:
+                try:
+                    await self.send(task)
+                except Exception as exc:
+                    logger.exception(
+                        "[SENDER] Error sending task_id=%s recipient=%s",
+                        task.id,
+                        task.recipient_email,
+                    )
+                    errors[task.id] = exc
+
+        await asyncio.gather(*(send_one(task) for task in tasks))
+        return errors
@@ -1,10 +1,21 @@
-from email_providers.base import BaseEmailProviderAdapter
-from email_providers.gmail import GmailAdapter
-from email_providers.sendgrid import SendGridAdapter
+import os
+
+import httpx
+
+from email_providers.base import AsyncBaseEmailProviderAdapter, BaseEmailProviderAdapter
+from email_providers.gmail import AsyncGmailAdapter, GmailAdapter
+from email_providers.registry import ProviderRegistry
+from email_providers.sendgrid import AsyncSendGridAdapter, SendGridAdapter
 from db.db_models import EmailAccount, EmailProvider
-from db.db_connection import get_sync_db
+from dotenv import load_dotenv
 
-def provider_factory(account: EmailAccount) -> BaseEmailProviderAdapter:
+load_dotenv()
+
+# Seconds a worker keeps a built provider client before rebuilding it
+PROVIDER_CACHE_TTL = float(os.getenv("PROVIDER_CACHE_TTL", "900"))
+
+
+def build_provider(account: EmailAccount) -> BaseEmailProviderAdapter:
     if account.provider == EmailProvider.SENDGRID:
         return SendGridAdapter(account)
     
@@ -13,3 +24,20 @@ def provider_factory(account: EmailAccount) -> BaseEmailProviderAdapter:
 
 
     raise ValueError("Unsupported provider")
+
+
+provider_registry = ProviderRegistry(build_provider, ttl=PROVIDER_CACHE_TTL)
+
+
+def provider_factory(account: EmailAccount) -> BaseEmailProviderAdapter:
+    return provider_registry.get(account)
+
+
+def async_provider_factory(account: EmailAccount, client: httpx.AsyncClient) -> AsyncBaseEmailProviderAdapter:
+    if account.provider == EmailProvider.SENDGRID:
+        return AsyncSendGridAdapter(account, client)
+
+    if account.provider == EmailProvider.GMAIL:
+        return AsyncGmailAdapter(account, client)
+
+    raise ValueError("Unsupported provider")
@@ -1,16 +1,20 @@
-import json
+import asyncio
 import base64
+import time
+from datetime import datetime, timezone
 
+import httpx
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 
 from email.mime.text import MIMEText
 
+from db.models.email_account import EmailAccount
 from db.models.email_task import EmailTask
-from email_providers.base import BaseEmailProviderAdapter
-from sqlalchemy.orm import Session
-from db.db_connection import get_sync_db
+from email_providers.base import AsyncBaseEmailProviderAdapter, BaseEmailProviderAdapter
+from sqlalchemy import update
+from db.db_connection import AsyncSessionLocal, get_sync_db
 import os
 from dotenv import load_dotenv
 
@@ -20,96 +24,134 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 
 
-class GmailAdapter(BaseEmailProviderAdapter):
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+GMAIL_SEND_URL = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
 
-    def send(self, task: EmailTask):
-        with get_sync_db() as session:
 
-            creds = Credentials(
-                token=self.account.config["access_token"],
-                refresh_token=self.account.config["refresh_token"],
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=GOOGLE_CLIENT_ID,
-                client_secret=GOOGLE_CLIENT_SECRET,
-                scopes=[
-                    "https://www.googleapis.com/auth/gmail.send"
-                ],
-            )
+def build_raw_message(account: EmailAccount, task: EmailTask) -> str:
+    message = MIMEText(task.rendered_body)
 
-            if creds.expired and creds.refresh_token:
+    message["to"] = task.recipient_email
+    message["from"] = account.email_address
+    message["subject"] = task.rendered_subject
 
-                creds.refresh(Request())
+    return base64.urlsafe_b64encode(
+        message.as_bytes()
+    ).decode()
 
-                self.account.config = json.loads(
-                    creds.to_json()
-                )
 
-                session.add(self.account)
-                session.commit()
+class GmailAdapter(BaseEmailProviderAdapter):
 
-            service = build(
-                "gmail",
-                "v1",
-                credentials=creds,
-            )
+    def __init__(self, account: EmailAccount):
+        super().__init__(account)
 
-            message = MIMEText(task.rendered_body)
-
-            message["to"] = task.recipient_email
-            message["from"] = self.account.email_address
-            message["subject"] = task.rendered_subject
-
-            raw = base64.urlsafe_b64encode(
-                message.as_bytes()
-            ).decode()
-
-            service.users().messages().send(
-                userId="me",
-                body={"raw": raw},
-            ).execute()
-            session = get_sync_db()
-            creds = Credentials(
-            token=self.account.config["access_token"],
-            refresh_token=self.account.config["refresh_token"],
-            token_uri="https://oauth2.googleapis.com/token",
+        expires_at = self.secrets.get("expires_at")
+        self.creds = Credentials(
+            token=self.secrets["access_token"],
+            refresh_token=self.secrets.get("refresh_token"),
+            token_uri=GOOGLE_TOKEN_URI,
             client_id=GOOGLE_CLIENT_ID,
             client_secret=GOOGLE_CLIENT_SECRET,
             scopes=[
                 "https://www.googleapis.com/auth/gmail.send"
-    ],
-)
-            if creds.expired and creds.refresh_token:
-
-                creds.refresh(Request())
+            ],
+            expiry=datetime.utcfromtimestamp(expires_at) if expires_at else None,
+        )
+        # the discovery document is parsed once per adapter, not per send
+        self.service = build(
+            "gmail",
+            "v1",
+            credentials=self.creds,
+            cache_discovery=False,
+        )
+
+    def is_expired(self) -> bool:
+        # expired credentials without a refresh token cannot be renewed
+        return self.creds.expired and not self.creds.refresh_token
+
+    def _refresh_credentials(self):
+        self.creds.refresh(Request())
+
+        self.account.config = {
+            **self.secrets,
+            "access_token": self.creds.token,
+            "refresh_token": self.creds.refresh_token,
+            "expires_at": (
+                int(self.creds.expiry.replace(tzinfo=timezone.utc).timestamp())
+                if self.creds.expiry else None
+            ),
+        }
+        self.secrets = self.account.config
 
-                self.account.config = json.loads(
-                    creds.to_json()
-                )
-                session.add(self.account)
-                session.commit()
-
-            service = build(
-                "gmail",
-                "v1",
-                credentials=creds,
+        with get_sync_db() as session:
+            session.execute(
+                update(EmailAccount)
+                .where(EmailAccount.id == self.account.id)
+                .values(_config=self.account._config)
             )
+            session.commit()
 
-            message = MIMEText(task.rendered_body)
-
-            message["to"] = task.recipient_email
-            message["from"] = self.account.email_address
-            message["subject"] = task.rendered_subject
-
-            # ---- 5️⃣ Encode message ----
-            raw = base64.urlsafe_b64encode(
-                message.as_bytes()
-            ).decode()
+    def send(self, task: EmailTask):
+        if self.creds.expired and self.creds.refresh_token:
+            self._refresh_credentials()
+
+        self.service.users().messages().send(
+            userId="me",
+            body={"raw": build_raw_message(self.account, task)},
+        ).execute()
+
+
+class AsyncGmailAdapter(AsyncBaseEmailProviderAdapter):
+    """Sends through the Gmail REST API directly, refreshing the access token over the shared client."""
+
+    def __init__(self, account: EmailAccount, client: httpx.AsyncClient):
+        super().__init__(account, client)
+        self._refresh_lock = asyncio.Lock()
+
+    def _token_expired(self) -> bool:
+        expires_at = self.secrets.get("expires_at")
+        # refresh a minute early so in-flight sends don't race the expiry
+        return bool(expires_at) and expires_at - 60 <= time.time()
+
+    async def _refresh_credentials(self):
+        async with self._refresh_lock:
+            if not self._token_expired():
+                return
+
+            response = await self.client.post(
+                GOOGLE_TOKEN_URI,
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": self.secrets["refresh_token"],
+                    "client_id": GOOGLE_CLIENT_ID,
+                    "client_secret": GOOGLE_CLIENT_SECRET,
+                },
+            )
+            response.raise_for_status()
+            token = response.json()
 
-            body = {
-                "raw": raw
+            self.account.config = {
+                **self.secrets,
+                "access_token": token["access_token"],
+                "expires_at": int(time.time()) + int(token.get("expires_in", 3600)),
             }
+            self.secrets = self.account.config
 
-            service.users().messages().send(
-                userId="me",
-                body=body,
-            ).execute()
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(EmailAccount)
+                    .where(EmailAccount.id == self.account.id)
+                    .values(_config=self.account._config)
+                )
+                await session.commit()
+
+    async def send(self, task: EmailTask):
+        if self._token_expired() and self.secrets.get("refresh_token"):
+            await self._refresh_credentials()
+
+        response = await self.client.post(
+            GMAIL_SEND_URL,
+            json={"raw": build_raw_message(self.account, task)},
+            headers={"Authorization": f"Bearer {self.secrets['access_token']}"},
+        )
+        response.raise_for_status()
@@ -0,0 +1,49 @@
+import threading
+import time
+from typing import Callable
+
+from db.db_models import EmailAccount
+from email_providers.base import BaseEmailProviderAdapter
+
+
+class ProviderRegistry:
+    """
+    Per worker process cache of provider adapters keyed by EmailAccount.id.
+
+    Adapters keep their API clients and credentials between sends, so a
+    cached adapter only pays for the HTTP call. An entry is rebuilt when
+    it is older than ``ttl`` seconds, when the adapter reports its
+    credentials can no longer be used, or when the account's encrypted
+    config no longer matches the one the adapter was built from.
+    """
+
+    def __init__(self, build: Callable[[EmailAccount], BaseEmailProviderAdapter], ttl: float):
+        self.build = build
+        self.ttl = ttl
+        self._entries: dict[int, tuple[BaseEmailProviderAdapter, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, account: EmailAccount) -> BaseEmailProviderAdapter:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(account.id)
+            if entry is not None:
+                adapter, built_at = entry
+                if (
+                    now - built_at < self.ttl
+                    and adapter.account._config == account._config
+                    and not adapter.is_expired()
+                ):
+                    return adapter
+
+            adapter = self.build(account)
+            self._entries[account.id] = (adapter, now)
+            return adapter
+
+    def evict(self, account_id: int):
+        with self._lock:
+            self._entries.pop(account_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
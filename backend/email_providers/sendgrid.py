@@ -1,19 +1,132 @@
-from email_providers.base import BaseEmailProviderAdapter
-from db.db_models import EmailTask
-from db.db_models import *
+import asyncio
+import logging
+
+from email_providers.base import AsyncBaseEmailProviderAdapter, BaseEmailProviderAdapter
+from db.db_models import EmailAccount, EmailTask
 from sendgrid import Mail,SendGridAPIClient,CustomArg
+from sendgrid.helpers.mail import Personalization, Substitution, To
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+# mail/send accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+# substitutions of a single personalization are capped at 10000 bytes
+MAX_SUBSTITUTION_BYTES = 10000
+BODY_SUBSTITUTION_TAG = "-mailforge_body-"
+
+
+def build_message(account: EmailAccount, task: EmailTask) -> Mail:
+    message = Mail(
+        from_email=account.email_address,
+        to_emails=task.recipient_email,
+        subject=task.rendered_subject,
+        plain_text_content=task.rendered_body,
+    )
+
+    message.add_custom_arg(CustomArg("email_task_id", str(task.id)))
+    message.add_custom_arg(CustomArg("email_job_id", str(task.job_id)))
+    return message
+
+
+def build_bulk_message(account: EmailAccount, tasks: list[EmailTask]) -> Mail:
+    """
+    One mail/send request where every task is its own personalization.
+
+    Each personalization carries the task's subject, its rendered body as
+    a substitution and the same email_task_id / email_job_id custom args
+    as ``build_message``, so webhook events still map back to tasks.
+    """
+    message = Mail(
+        from_email=account.email_address,
+        plain_text_content=BODY_SUBSTITUTION_TAG,
+    )
+
+    for task in tasks:
+        personalization = Personalization()
+        personalization.add_to(To(task.recipient_email))
+        personalization.subject = task.rendered_subject or ""
+        personalization.add_substitution(
+            Substitution(BODY_SUBSTITUTION_TAG, task.rendered_body or "")
+        )
+        personalization.add_custom_arg(CustomArg("email_task_id", str(task.id)))
+        personalization.add_custom_arg(CustomArg("email_job_id", str(task.job_id)))
+        message.add_personalization(personalization)
+
+    return message
+
+
+def split_bulk(tasks: list[EmailTask]) -> tuple[list[list[EmailTask]], list[EmailTask]]:
+    """Split tasks into personalization chunks and the ones whose body is too large for a substitution."""
+    bulk, single = [], []
+    for task in tasks:
+        body_size = len((task.rendered_body or "").encode())
+        (bulk if body_size <= MAX_SUBSTITUTION_BYTES else single).append(task)
+
+    chunks = [
+        bulk[start:start + MAX_PERSONALIZATIONS]
+        for start in range(0, len(bulk), MAX_PERSONALIZATIONS)
+    ]
+    return chunks, single
+
 
 class SendGridAdapter(BaseEmailProviderAdapter):
+    def __init__(self, account: EmailAccount):
+        super().__init__(account)
+        self.client = SendGridAPIClient(self.secrets["api_key"])
+
     def send(self, task: EmailTask):
-        message = Mail(
-            from_email=self.account.email_address,
-            to_emails=task.recipient_email,
-            subject=task.rendered_subject,
-            plain_text_content=task.rendered_body,
+        self.client.send(build_message(self.account, task))
+
+    def send_many(self, tasks: list[EmailTask]) -> dict[int, Exception]:
+        """Send up to MAX_PERSONALIZATIONS tasks per mail/send request."""
+        chunks, single = split_bulk(tasks)
+
+        errors = {}
+        for chunk in chunks:
+            try:
+                self.client.send(build_bulk_message(self.account, chunk))
+            except Exception as exc:
+                logger.exception(
+                    "[SENDER] SendGrid bulk request for %d tasks failed",
+                    len(chunk),
+                )
+                for task in chunk:
+                    errors[task.id] = exc
+
+        errors.update(super().send_many(single))
+        return errors
+
+
+class AsyncSendGridAdapter(AsyncBaseEmailProviderAdapter):
+
+    async def _post(self, message: Mail):
+        response = await self.client.post(
+            SENDGRID_SEND_URL,
+            json=message.get(),
+            headers={"Authorization": f"Bearer {self.secrets['api_key']}"},
         )
+        response.raise_for_status()
+
+    async def send(self, task: EmailTask):
+        await self._post(build_message(self.account, task))
+
+    async def send_many(self, tasks: list[EmailTask], limit: asyncio.Semaphore) -> dict[int, Exception]:
+        chunks, single = split_bulk(tasks)
+        errors = {}
 
-        message.add_custom_arg(CustomArg("email_task_id", str(task.id)))
-        message.add_custom_arg(CustomArg("email_job_id", str(task.job_id)))
+        async def send_chunk(chunk: list[EmailTask]):
+            async with limit:
+                try:
+                    await self._post(build_bulk_message(self.account, chunk))
+                except Exception as exc:
+                    logger.exception(
+                        "[SENDER] SendGrid bulk request for %d tasks failed",
+                        len(chunk),
+                    )
+                    for task in chunk:
+                        errors[task.id] = exc
 
-        client = SendGridAPIClient(self.secrets["api_key"])
-        client.send(message)
+        await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        errors.update(await super().send_many(single, limit))
+        return errors
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from db.db_models import EmailJobStatus
 from datetime import datetime
 from typing import Optional
@@ -10,3 +10,7 @@ class CreateEmailJobRequest(BaseModel):
     subject_template: str
     scheduled_at: Optional[datetime] = None
     throttle_per_minute: Optional[int] = 60
+    # relative share of dispatch capacity when tenants compete for it
+    priority: int = Field(default=1, ge=1, le=100)
+    # render per recipient at send time instead of storing rendered copies
+    lazy_render: bool = False
@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A token bucket holding ``capacity`` tokens refilled every ``period`` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+
+class BaseRateLimiter(ABC):
+
+    @abstractmethod
+    def acquire(self, key: str, limit: RateLimit, requested: int) -> int:
+        """Take up to ``requested`` tokens from ``key`` and return how many were granted."""
+        ...
+
+    @abstractmethod
+    def release(self, key: str, limit: RateLimit, amount: int):
+        """Return unused tokens to ``key`` (never above its capacity)."""
+        ...
+
+    def acquire_all(self, buckets: list[tuple[str, RateLimit]], requested: int) -> int:
+        """
+        Take the same number of tokens from every bucket in ``buckets``.
+
+        Each bucket can only shrink the grant, so tokens taken from earlier
+        buckets in excess of what a later bucket allowed are released.
+        """
+        granted = requested
+        taken: list[tuple[str, RateLimit, int]] = []
+
+        for key, limit in buckets:
+            if granted <= 0:
+                break
+            got = self.acquire(key, limit, granted)
+            taken.append((key, limit, got))
+            granted = min(granted, got)
+
+        for key, limit, got in taken:
+            if got > granted:
+                self.release(key, limit, got - granted)
+
+        return max(granted, 0)
+
+    def release_all(self, buckets: list[tuple[str, RateLimit]], amount: int):
+        if amount <= 0:
+            return
+        for key, limit in buckets:
+            self.release(key, limit, amount)
@@ -0,0 +1,79 @@
+import logging
+import os
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.exceptions import RedisError
+
+from db.db_models import EmailJob, EmailProvider
+from rate_limiters.base import BaseRateLimiter, RateLimit
+from rate_limiters.memory import InMemoryRateLimiter
+from rate_limiters.redis import RedisRateLimiter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITER_BACKEND = os.getenv("RATE_LIMITER_BACKEND", "redis")
+RATE_LIMITER_REDIS_URL = os.getenv("RATE_LIMITER_REDIS_URL", "redis://localhost:6379/2")
+
+# Per sending account limits enforced on top of EmailJob.throttle_per_minute
+PROVIDER_LIMITS: dict[EmailProvider, dict[str, RateLimit]] = {
+    EmailProvider.GMAIL: {
+        "daily": RateLimit(int(os.getenv("GMAIL_DAILY_LIMIT", "2000")), 86400),
+    },
+    EmailProvider.SENDGRID: {
+        "second": RateLimit(int(os.getenv("SENDGRID_PER_SECOND_LIMIT", "100")), 1),
+    },
+}
+
+_limiter: BaseRateLimiter | None = None
+
+
+def get_rate_limiter() -> BaseRateLimiter:
+    """Return the process wide limiter, falling back to memory if Redis is unreachable."""
+    global _limiter
+    if _limiter is not None:
+        return _limiter
+
+    if RATE_LIMITER_BACKEND == "redis":
+        try:
+            client = Redis.from_url(RATE_LIMITER_REDIS_URL)
+            client.ping()
+            _limiter = RedisRateLimiter(client)
+            return _limiter
+        except RedisError:
+            logger.warning(
+                "[RATE LIMITER] Redis unavailable at %s, using in-process buckets",
+                RATE_LIMITER_REDIS_URL,
+            )
+
+    _limiter = InMemoryRateLimiter()
+    return _limiter
+
+
+def job_buckets(
+    job: EmailJob,
+    provider: EmailProvider,
+    pacing_window: float | None = None,
+) -> list[tuple[str, RateLimit]]:
+    """
+    Buckets a send for ``job`` has to draw from: the job itself, then its account.
+
+    With a ``pacing_window`` (seconds) the job's bucket refills at the
+    same rate but only holds that window's worth of tokens, so a minute's
+    budget is handed out a slice at a time instead of all at once.
+    """
+    throttle = job.throttle_per_minute or 60
+    if pacing_window:
+        burst = max(1, round(throttle * pacing_window / 60))
+        buckets = [
+            (f"job:{job.id}:paced", RateLimit(burst, burst * 60 / throttle)),
+        ]
+    else:
+        buckets = [
+            (f"job:{job.id}", RateLimit(throttle, 60)),
+        ]
+    for name, limit in PROVIDER_LIMITS.get(provider, {}).items():
+        buckets.append((f"account:{job.email_account_id}:{name}", limit))
+    return buckets
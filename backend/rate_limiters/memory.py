@@ -0,0 +1,36 @@
+import threading
+import time
+
+from rate_limiters.base import BaseRateLimiter, RateLimit
+
+
+class InMemoryRateLimiter(BaseRateLimiter):
+    """
+    Token buckets kept in the current process.
+
+    Only correct when a single process makes throttling decisions, which
+    is the case for the beat-driven dispatcher.
+    """
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, limit: RateLimit, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (limit.capacity, now))
+        elapsed = max(0.0, now - updated_at)
+        return min(limit.capacity, tokens + elapsed * limit.refill_rate)
+
+    def acquire(self, key: str, limit: RateLimit, requested: int) -> int:
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._refill(key, limit, now)
+            granted = max(0, min(requested, int(tokens)))
+            self._buckets[key] = (tokens - granted, now)
+            return granted
+
+    def release(self, key: str, limit: RateLimit, amount: int):
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._refill(key, limit, now)
+            self._buckets[key] = (min(limit.capacity, tokens + amount), now)
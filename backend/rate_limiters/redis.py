@@ -0,0 +1,62 @@
+import math
+import time
+
+from redis import Redis
+
+from rate_limiters.base import BaseRateLimiter, RateLimit
+
+# KEYS[1] bucket hash, ARGV: capacity, refill rate (tokens/s), delta, now.
+# A positive delta takes up to that many tokens and returns the grant,
+# a negative delta gives tokens back. Runs atomically inside Redis so
+# every dispatcher/worker shares the same buckets.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local delta = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local granted = 0
+if delta >= 0 then
+    granted = math.min(delta, math.floor(tokens))
+    tokens = tokens - granted
+else
+    tokens = math.min(capacity, tokens - delta)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[5]))
+return granted
+"""
+
+
+class RedisRateLimiter(BaseRateLimiter):
+
+    def __init__(self, client: Redis, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _call(self, key: str, limit: RateLimit, delta: int) -> int:
+        # an idle bucket is full again after one period, so it can expire
+        ttl_ms = math.ceil(limit.period * 1000) + 1000
+        return int(
+            self._script(
+                keys=[self.prefix + key],
+                args=[limit.capacity, limit.refill_rate, delta, time.time(), ttl_ms],
+            )
+        )
+
+    def acquire(self, key: str, limit: RateLimit, requested: int) -> int:
+        if requested <= 0:
+            return 0
+        return self._call(key, limit, requested)
+
+    def release(self, key: str, limit: RateLimit, amount: int):
+        if amount > 0:
+            self._call(key, limit, -amount)
@@ -1,19 +1,26 @@
-from fastapi import APIRouter, File, Form, UploadFile, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, File, Form, UploadFile, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import csv, io, uuid, aiofiles, os
 from pydantic_models.dataset import DatasetRepr
-from tasks.process_csv import process_csv_background
+from celery_app import celery_app
 from db.db_connection import get_db
-from db.db_models import Dataset, SourceType, DatasetRow, User
+from db.db_models import Dataset, SourceType, DatasetRow, DatasetStorageFormat, User
 from dependency import get_current_user
 from fastapi_pagination import Page,paginate
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Row layout for new datasets: "array" stores values positionally against
+# json_schema instead of repeating every column name in every row.
+DATASET_STORAGE_FORMAT = DatasetStorageFormat(os.getenv("DATASET_STORAGE_FORMAT", "array"))
+
 dataset_router = APIRouter(prefix="/datasets")
 
 
 @dataset_router.post("/", response_model=dict)
 async def upload_csv(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     email_column: str = Form(...),
     name: str = Form(...),
@@ -55,15 +62,16 @@ async def upload_csv(
         user_id=user.id,
         name=name,
         email_column=email_column,
+        storage_format=DATASET_STORAGE_FORMAT,
     )
 
     db.add(dataset)
     await db.flush()   # get dataset.id
     await db.commit()
-    background_tasks.add_task(
-        process_csv_background,
-        file_path,
-        dataset.id
+    # parsing and inserting runs on the Celery "datasets" queue, not in the API process
+    celery_app.send_task(
+        "tasks.ingest_dataset",
+        args=[os.path.abspath(file_path), dataset.id],
     )
     return {
         "columns": columns,
@@ -168,7 +176,7 @@ async def get_preview(
 
     response = {
         "json_schema": dataset.json_schema,
-        "rows": rows_result.scalars().all()
+        "rows": [dataset.decode_row(row) for row in rows_result.scalars().all()]
     }
 
     return response
\ No newline at end of file
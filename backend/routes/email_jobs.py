@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic_models.email_jobs import CreateEmailJobRequest
 from db.db_connection import get_db
-from db.db_models import EmailJob,EmailJobStatus
+from db.db_models import EmailJob,EmailJobAnalytics,EmailJobStatus
 from sqlalchemy import select
-from db.db_models import Dataset,DatasetRow, EmailTask, EmailAccount,EmailTaskStatus,User
+from db.db_models import Dataset,DatasetRow,DatasetStatus, EmailAccount,User
 from dependency import get_current_user
+from celery_app import celery_app
+from dispatcher.notify import notify_dispatcher
 jobs_router = APIRouter(prefix='/email-jobs')
 
 @jobs_router.post("/")
@@ -18,9 +20,9 @@ async def create_email_job(
     Create an email job and queue it for background processing.
 
     This endpoint:
-    1. Validates the dataset exists
+    1. Validates the dataset exists and has rows
     2. Creates the EmailJob record
-    3. Queues a Celery task to process all emails
+    3. Queues a Celery task that creates the EmailTasks in chunks
     4. Returns immediately
     """
 
@@ -36,10 +38,20 @@ async def create_email_job(
             detail=f"Dataset {payload.dataset_id} not found",
         )
 
+    if dataset.dataset_status != DatasetStatus.COMPLETED:
+        raise HTTPException(400, detail="Dataset is still processing")
+
+    has_rows = await session.execute(
+        select(DatasetRow.id).where(DatasetRow.dataset_id == dataset.id).limit(1)
+    )
+    if has_rows.scalar_one_or_none() is None:
+        raise HTTPException(400, detail="Dataset has no rows")
+
     # Validate email account exists
-    account = await session.execute(
+    result = await session.execute(
         select(EmailAccount).where(EmailAccount.id==payload.email_account_id).where(EmailAccount.user_id==user.id)
     )
+    account = result.scalar_one_or_none()
 
     if not account:
         raise HTTPException(
@@ -56,54 +68,21 @@ async def create_email_job(
         subject_template=payload.subject_template,
         scheduled_at=payload.scheduled_at,
         throttle_per_minute=payload.throttle_per_minute,
+        priority=payload.priority,
+        lazy_render=payload.lazy_render,
         status=EmailJobStatus.SCHEDULED,
     )
     session.add(job)
+    await session.flush()
+    session.add(EmailJobAnalytics(job_id=job.id))
     await session.commit()
-    result = await session.execute(
-        select(DatasetRow).where(DatasetRow.dataset_id == dataset.id)
-    )
-    rows = result.scalars().all()
-
-    if not rows:
-        raise HTTPException(400, detail="Dataset has no rows")
-
-    if len(rows) > 5000:
-        raise HTTPException(
-            400,
-            detail="Dataset too large for synchronous job creation"
-        )
-
-    # 5. Create EmailTasks
-    tasks = []
-    for row in rows:
-        recipient = row.row_data.get(dataset.email_column)
-
-        if not recipient:
-            continue  # skip rows without email
-
-        tasks.append(
-            EmailTask(
-                job_id=job.id,
-                dataset_row_id=row.id,
-                recipient_email=recipient.strip(),
-                status=EmailTaskStatus.PENDING,
-                rendered_body=render_template(job.prompt_template,row.row_data),
-                rendered_subject=render_template(job.subject_template,row.row_data)
-            )
-        )
-
-    if not tasks:
-        raise HTTPException(
-            400,
-            detail="No valid recipient emails found in dataset"
-        )
-
-    session.add_all(tasks)
-    await session.commit()
-    
     await session.refresh(job)
 
+    # EmailTasks are created in chunks by a worker; the dispatcher starts
+    # sending the first chunks while later ones are still being rendered
+    celery_app.send_task("tasks.materialize_email_job", args=[job.id])
+    notify_dispatcher("job_created", job.id)
+
     return {
         "job_id": job.id,
         "status": job.status.value,
@@ -111,11 +90,42 @@ async def create_email_job(
         "dataset_id": payload.dataset_id,
         "email_account_id": payload.email_account_id,
     }
-    
-def render_template(template: str, data: dict) -> str:
-    if not template:
-        return ""
-    result = template
-    for key, value in data.items():
-        result = result.replace(f"{{{key}}}", str(value))
-    return result
\ No newline at end of file
+
+
+@jobs_router.get("/{job_id}/stats")
+async def get_email_job_stats(
+    job_id: int,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Counters of a job, read from its EmailJobAnalytics row.
+
+    The counters are maintained as events are recorded and flushed every
+    few seconds, so they can lag the raw events slightly.
+    """
+    result = await session.execute(
+        select(EmailJob.status, EmailJobAnalytics)
+        .outerjoin(EmailJobAnalytics, EmailJobAnalytics.job_id == EmailJob.id)
+        .where(EmailJob.id == job_id)
+        .where(EmailJob.user_id == user.id)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Email job {job_id} not found",
+        )
+
+    job_status, analytics = row
+    return {
+        "job_id": job_id,
+        "status": job_status.value,
+        "sent": analytics.sent_count if analytics else 0,
+        "delivered": analytics.delivered_count if analytics else 0,
+        "opened": analytics.opened_count if analytics else 0,
+        "clicked": analytics.clicked_count if analytics else 0,
+        "bounced": analytics.bounced_count if analytics else 0,
+        "failed": analytics.failed_count if analytics else 0,
+    }
@@ -1,20 +1,28 @@
 from fastapi import APIRouter, Request, Header, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.db_connection import get_db
-from db.db_models import EmailTask, EmailEvent, EmailTaskStatus
-
-
-EVENT_TO_STATUS = {
-    "processed": EmailTaskStatus.SENT,
-    "delivered": EmailTaskStatus.DELIVERED,
-    "open": EmailTaskStatus.OPENED,
-    "bounce": EmailTaskStatus.BOUNCED,
-    "dropped": EmailTaskStatus.FAILED,
-}
-
+from analytics.base import count_events
+from analytics.factory import record_job_counts
 
+from celery_app import celery_app
+from db.db_connection import get_db
+from services.sendgrid_events import (
+    event_ids,
+    event_task_id,
+    load_tasks_query,
+    plan_events,
+    seen_event_ids_query,
+)
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# inline = record events before responding, queue = hand the batch to
+# tasks.ingest_sendgrid_events and acknowledge right away
+WEBHOOK_INGEST_MODE = os.getenv("WEBHOOK_INGEST_MODE", "inline")
 
 webhook_integration_router = APIRouter(prefix="/webhook")
 
@@ -33,46 +41,35 @@ async def sendgrid_webhook(
     if not isinstance(events, list):
         return PlainTextResponse("invalid_request", status_code=400)
     
-    # 3️⃣ Process each event
-    for event in events:
-        custom_args = event.get("custom_args")
-        if not custom_args:
-            continue
-
-        email_task_id = custom_args.get("email_task_id")
-        if not email_task_id:
-            continue
-
-        try:
-            email_task_id = int(email_task_id)
-        except ValueError:
-            continue
-
-        email_task = await db.get(EmailTask, email_task_id)
-        if not email_task:
-            continue
-
-        db.add(
-            EmailEvent(
-                email_task_id=email_task.id,
-                email_job_id=email_task.job_id,
-                event_type=event.get("event", "unknown"),
-                payload=event,
-            )
-        )
-
-        # 5️⃣ Update task status
-        new_status = EVENT_TO_STATUS.get(event.get("event"))
-        if new_status:
-            email_task.status = new_status
-
-        # 6️⃣ Store provider message id (optional)
-        sg_message_id = event.get("sg_message_id")
-        if sg_message_id and not email_task.provider_message_id:
-            email_task.provider_message_id = sg_message_id
-
-    # 7️⃣ Commit once
+    # 3️⃣ Queue mode: acknowledge fast, a worker records the batch
+    if WEBHOOK_INGEST_MODE == "queue":
+        if any(event_task_id(event) for event in events):
+            celery_app.send_task("tasks.ingest_sendgrid_events", args=[events])
+        return {"status": "queued"}
+
+    # 4️⃣ Load every task the batch refers to, and the events already seen
+    task_ids = {task_id for event in events if (task_id := event_task_id(event))}
+    tasks = {}
+    if task_ids:
+        result = await db.execute(load_tasks_query(task_ids))
+        tasks = {row.id: row for row in result.all()}
+
+    provider_event_ids = event_ids(events)
+    seen = set()
+    if tasks and provider_event_ids:
+        result = await db.execute(seen_event_ids_query(provider_event_ids))
+        seen = set(result.scalars())
+
+    # 5️⃣ Insert the events and apply status / message id changes in bulk
+    plan = plan_events(events, tasks, seen)
+    for statement, params in plan.statements():
+        await db.execute(statement, params)
+
+    # 6️⃣ Commit once
     await db.commit()
 
+    # 7️⃣ Buffer the job analytics increments (may flush in-process)
+    await run_in_threadpool(record_job_counts, count_events(plan.recorded))
+
     return {"status": "ok"}
 
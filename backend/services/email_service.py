@@ -1,4 +1,6 @@
-from db.db_models import EmailAccount,EmailTask
+from datetime import datetime
+from sqlalchemy import bindparam, case, update
+from db.db_models import EmailAccount,EmailTask,EmailTaskStatus
 from email_providers.factory import provider_factory
 import os
 from dotenv import load_dotenv
@@ -7,7 +9,84 @@ from dotenv import load_dotenv
 def send_email(account:EmailAccount, task:EmailTask):
     provider = provider_factory(account)
     provider.send(task)
-    
+
+
+def build_send_results(
+    tasks: list[EmailTask],
+    errors: dict[int, Exception],
+    final: bool = False,
+    owner: str | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Build the ``send_results_update`` params and the EmailEvent rows for a sent batch.
+
+    Shared by the sync and async senders so both record results the same way.
+    ``final`` marks the last attempt: its failures also get a "failed" event.
+    ``owner`` is the ``claimed_by`` the batch took its tasks with.
+    """
+    now = datetime.utcnow()
+    status_rows = []
+    event_rows = []
+
+    for task in tasks:
+        error = errors.get(task.id)
+        status_rows.append({
+            "b_id": task.id,
+            "b_owner": owner,
+            "b_status": EmailTaskStatus.FAILED if error else EmailTaskStatus.SENT,
+            "b_error": str(error) if error else None,
+            "b_sent_at": None if error else now,
+        })
+        if error and not final:
+            continue
+        payload = {
+            "recipient": task.recipient_email,
+            "timestamp": now.isoformat(),
+        }
+        if error:
+            payload["error"] = str(error)
+        event_rows.append({
+            "email_task_id": task.id,
+            "email_job_id": task.job_id,
+            "event_type": "failed" if error else "sent",
+            "payload": payload,
+            "created_at": now,
+        })
+
+    return status_rows, event_rows
+
+
+def send_results_update():
+    """
+    UPDATE recording a sent batch, executed with ``build_send_results`` params.
+
+    Only tasks the batch still holds are written. The status only moves
+    while the task is IN_PROGRESS, so a "delivered" or "open" the webhook
+    recorded before the batch committed is not downgraded to SENT.
+    """
+    table = EmailTask.__table__
+    return (
+        update(table)
+        .where(
+            table.c.id == bindparam("b_id"),
+            table.c.claimed_by == bindparam("b_owner"),
+        )
+        .values(
+            status=case(
+                (
+                    table.c.status == EmailTaskStatus.IN_PROGRESS,
+                    bindparam("b_status", type_=table.c.status.type),
+                ),
+                else_=table.c.status,
+            ),
+            error=bindparam("b_error"),
+            sent_at=bindparam("b_sent_at", type_=table.c.sent_at.type),
+            # the batch is done with the task either way
+            claimed_by=None,
+            lease_expires_at=None,
+        )
+    )
+
 # services/oauth_tokens.py
 from datetime import datetime, timedelta
 from jose import jwt
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert, select, update
+
+from db.db_models import EmailEvent, EmailTask, EmailTaskStatus
+
+EVENT_TO_STATUS = {
+    "processed": EmailTaskStatus.SENT,
+    "delivered": EmailTaskStatus.DELIVERED,
+    "open": EmailTaskStatus.OPENED,
+    "bounce": EmailTaskStatus.BOUNCED,
+    "dropped": EmailTaskStatus.FAILED,
+}
+
+# Task statuses only move up this ranking through webhook events, so a
+# late "processed" can't overwrite "delivered" or "opened"
+STATUS_RANK = {
+    EmailTaskStatus.PENDING: 0,
+    EmailTaskStatus.IN_PROGRESS: 1,
+    EmailTaskStatus.SENT: 2,
+    EmailTaskStatus.DEFERRED: 2,
+    EmailTaskStatus.DELIVERED: 3,
+    EmailTaskStatus.BOUNCED: 3,
+    EmailTaskStatus.FAILED: 3,
+    EmailTaskStatus.OPENED: 4,
+}
+
+
+def lower_statuses(status: EmailTaskStatus) -> list[EmailTaskStatus]:
+    """Statuses a task may move to ``status`` from."""
+    return [
+        current
+        for current, rank in STATUS_RANK.items()
+        if rank < STATUS_RANK[status]
+    ]
+
+
+def event_task_id(event) -> int | None:
+    """The EmailTask id a SendGrid event refers to through its custom args, if any."""
+    if not isinstance(event, dict):
+        return None
+    custom_args = event.get("custom_args")
+    if not isinstance(custom_args, dict):
+        return None
+    try:
+        return int(custom_args.get("email_task_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def event_ids(events: list) -> set[str]:
+    """The sg_event_id of every event in a batch that has one."""
+    return {
+        str(event["sg_event_id"])
+        for event in events
+        if isinstance(event, dict) and event.get("sg_event_id")
+    }
+
+
+def load_tasks_query(task_ids: set[int]):
+    """Select what planning needs of every task referenced by a batch, in one query."""
+    return select(
+        EmailTask.id,
+        EmailTask.job_id,
+        EmailTask.status,
+        EmailTask.provider_message_id,
+    ).where(EmailTask.id.in_(task_ids))
+
+
+def seen_event_ids_query(provider_event_ids: set[str]):
+    """Select which of a batch's sg_event_ids were already recorded."""
+    return select(EmailEvent.provider_event_id).where(
+        EmailEvent.provider_event_id.in_(provider_event_ids)
+    )
+
+
+@dataclass
+class EventBatchPlan:
+    """The writes for a batch of SendGrid events, as a few set-based statements."""
+
+    event_rows: list[dict] = field(default_factory=list)
+    # new status -> ids of the tasks moving to it
+    status_updates: dict[EmailTaskStatus, list[int]] = field(default_factory=dict)
+    # {"id": task id, "provider_message_id": sg_message_id} for tasks without one
+    message_ids: list[dict] = field(default_factory=list)
+
+    @property
+    def recorded(self) -> list[tuple[int, str]]:
+        """``(email_job_id, event_type)`` of every event row, for job analytics."""
+        return [(row["email_job_id"], row["event_type"]) for row in self.event_rows]
+
+    def statements(self):
+        """Yield ``(statement, params)`` pairs; run them in order in one transaction."""
+        if self.event_rows:
+            yield insert(EmailEvent), self.event_rows
+
+        for status, task_ids in self.status_updates.items():
+            # the status guard keeps concurrent batches monotonic as well
+            yield (
+                update(EmailTask)
+                .where(
+                    EmailTask.id.in_(task_ids),
+                    EmailTask.status.in_(lower_statuses(status)),
+                )
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            ), None
+
+        if self.message_ids:
+            yield update(EmailTask), self.message_ids
+
+
+def plan_events(events: list, tasks: dict, seen_event_ids: set[str] = frozenset()) -> EventBatchPlan:
+    """
+    Plan the writes of a batch of events against the ``tasks`` loaded for it.
+
+    Events for unknown tasks are dropped, and so are events whose
+    sg_event_id is in ``seen_event_ids`` or repeated within the batch
+    (SendGrid delivers at least once). A task only moves to a status
+    ranked above its current one, whatever order its events arrive in.
+    """
+    plan = EventBatchPlan()
+    seen = set(seen_event_ids)
+    statuses: dict[int, EmailTaskStatus] = {}
+    message_ids: dict[int, str] = {}
+
+    for event in events:
+        task = tasks.get(event_task_id(event))
+        if task is None:
+            continue
+
+        provider_event_id = event.get("sg_event_id")
+        if provider_event_id:
+            provider_event_id = str(provider_event_id)
+            if provider_event_id in seen:
+                continue
+            seen.add(provider_event_id)
+
+        plan.event_rows.append({
+            "email_task_id": task.id,
+            "email_job_id": task.job_id,
+            "event_type": event.get("event", "unknown"),
+            "provider_event_id": provider_event_id,
+            "payload": event,
+        })
+
+        new_status = EVENT_TO_STATUS.get(event.get("event"))
+        current = statuses.get(task.id, task.status)
+        if new_status and STATUS_RANK[new_status] > STATUS_RANK[current]:
+            statuses[task.id] = new_status
+
+        sg_message_id = event.get("sg_message_id")
+        if sg_message_id and not task.provider_message_id:
+            message_ids.setdefault(task.id, sg_message_id)
+
+    for task_id, status in statuses.items():
+        plan.status_updates.setdefault(status, []).append(task_id)
+
+    plan.message_ids = [
+        {"id": task_id, "provider_message_id": sg_message_id}
+        for task_id, sg_message_id in message_ids.items()
+    ]
+    return plan
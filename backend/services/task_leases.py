@@ -0,0 +1,102 @@
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import update
+
+from db.db_connection import get_sync_db
+from db.db_models import EmailTask, EmailTaskStatus
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds an IN_PROGRESS task may go without a heartbeat before it is requeued
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "300"))
+# Seconds between lease extensions while a sender works on a batch
+TASK_HEARTBEAT_INTERVAL = float(
+    os.getenv("TASK_HEARTBEAT_INTERVAL", str(TASK_LEASE_SECONDS / 3))
+)
+
+
+def lease_expiry(now: datetime | None = None) -> datetime:
+    return (now or datetime.utcnow()) + timedelta(seconds=TASK_LEASE_SECONDS)
+
+
+def worker_id() -> str:
+    """Identifies the sending process in ``EmailTask.claimed_by``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def take_tasks_query(task_ids: list[int], owner: str):
+    """
+    Take the unowned tasks of a send batch for ``owner``, returning their ids.
+
+    A task is only taken while nobody holds it, so a redelivered or
+    duplicated batch message (the reaper requeued and the dispatcher
+    claimed it again) sends each task once. FAILED tasks are taken back
+    to IN_PROGRESS by retries.
+    """
+    return (
+        update(EmailTask)
+        .where(
+            EmailTask.id.in_(task_ids),
+            EmailTask.status.in_([EmailTaskStatus.IN_PROGRESS, EmailTaskStatus.FAILED]),
+            EmailTask.claimed_by.is_(None),
+        )
+        .values(
+            status=EmailTaskStatus.IN_PROGRESS,
+            claimed_by=owner,
+            lease_expires_at=lease_expiry(),
+        )
+        .returning(EmailTask.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class LeaseHeartbeat:
+    """
+    Extends the leases of the tasks ``owner`` holds while a batch is sent.
+
+    Runs in a background thread with its own session, so it keeps beating
+    while the sender blocks on provider requests, sync or async.
+    """
+
+    def __init__(self, task_ids: list[int], owner: str, interval: float = TASK_HEARTBEAT_INTERVAL):
+        self.task_ids = list(task_ids)
+        self.owner = owner
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.extend()
+            except Exception:
+                logger.exception("[SENDER] Lease heartbeat failed")
+
+    def extend(self):
+        with get_sync_db() as db:
+            db.execute(
+                update(EmailTask)
+                .where(
+                    EmailTask.id.in_(self.task_ids),
+                    EmailTask.claimed_by == self.owner,
+                    EmailTask.status == EmailTaskStatus.IN_PROGRESS,
+                )
+                .values(lease_expires_at=lease_expiry())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
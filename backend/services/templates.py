@@ -0,0 +1,209 @@
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from multiprocessing import current_process
+
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from db.db_models import Dataset, DatasetRow, EmailJob, EmailTask
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# {{column}} is the syntax routes/llm.py validates; the single brace
+# {column} form rendered by the original replace loop keeps working too.
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}|\{([^{}]+)\}")
+
+_MISSING = object()
+
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal text and placeholder segments.
+
+    ``literals`` always has one more item than ``placeholders`` so
+    rendering is a single join that interleaves the two, instead of one
+    pass over the template per column. A placeholder whose column is not
+    in the row is rendered back as its original text.
+    """
+
+    __slots__ = ("literals", "placeholders")
+
+    def __init__(self, template: str | None):
+        self.literals: list[str] = []
+        self.placeholders: list[tuple[str, str]] = []
+
+        template = template or ""
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(template):
+            self.literals.append(template[position:match.start()])
+            name = (match.group(1) or match.group(2)).strip()
+            self.placeholders.append((name, match.group(0)))
+            position = match.end()
+        self.literals.append(template[position:])
+
+    def render(self, data: dict) -> str:
+        parts = [self.literals[0]]
+        for (name, raw), literal in zip(self.placeholders, self.literals[1:]):
+            value = data.get(name, _MISSING)
+            parts.append(raw if value is _MISSING else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_columns(self, columns: dict[str, list], size: int) -> list[str]:
+        """
+        Render ``size`` rows given column-wise as ``{column: [value per row]}``.
+
+        Every segment becomes one sequence of ``size`` strings (a repeated
+        literal or a whole column) and the rows are assembled with a single
+        zip/join pass, so the per-row Python work is one ``str.join``.
+        """
+        if not self.placeholders:
+            return [self.literals[0]] * size
+
+        segments = []
+        for (name, raw), literal in zip(self.placeholders, self.literals[1:]):
+            column = columns.get(name)
+            segments.append(repeat(raw, size) if column is None else map(str, column))
+            if literal:
+                segments.append(repeat(literal, size))
+        if self.literals[0]:
+            segments.insert(0, repeat(self.literals[0], size))
+
+        return list(map("".join, zip(*segments)))
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str | None) -> CompiledTemplate:
+    return CompiledTemplate(template)
+
+
+def render_template(template: str, data: dict) -> str:
+    return compile_template(template).render(data)
+
+
+# Worker processes used by render_chunk, 0 renders in the calling process
+RENDER_PROCESSES = int(os.getenv("RENDER_PROCESSES", "0"))
+# Chunks smaller than this are not worth pickling to a process pool
+RENDER_PARALLEL_MIN_ROWS = int(os.getenv("RENDER_PARALLEL_MIN_ROWS", "20000"))
+
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _render_slice(args) -> tuple[list[str], list[str]]:
+    subject_template, body_template, columns, size = args
+    return (
+        subject_template.render_columns(columns, size),
+        body_template.render_columns(columns, size),
+    )
+
+
+def render_chunk(
+    subject_template: CompiledTemplate,
+    body_template: CompiledTemplate,
+    columns: dict[str, list],
+    size: int,
+) -> tuple[list[str], list[str]]:
+    """
+    Render the subjects and bodies of a chunk of rows given column-wise.
+
+    With RENDER_PROCESSES set the chunk is split into slices rendered on a
+    process pool. Celery prefork children are daemonic and cannot start
+    processes, so there (and for small chunks) rendering stays in-process.
+    """
+    global _render_pool
+
+    if RENDER_PROCESSES < 2 or size < RENDER_PARALLEL_MIN_ROWS or current_process().daemon:
+        return _render_slice((subject_template, body_template, columns, size))
+
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=RENDER_PROCESSES)
+
+    # only the columns the templates reference are shipped to the pool
+    names = {
+        name
+        for template in (subject_template, body_template)
+        for name, _ in template.placeholders
+    }
+    columns = {name: columns[name] for name in names if name in columns}
+
+    step = -(-size // RENDER_PROCESSES)
+    slices = [
+        (
+            subject_template,
+            body_template,
+            {name: values[start:start + step] for name, values in columns.items()},
+            min(step, size - start),
+        )
+        for start in range(0, size, step)
+    ]
+
+    subjects, bodies = [], []
+    for slice_subjects, slice_bodies in _render_pool.map(_render_slice, slices):
+        subjects.extend(slice_subjects)
+        bodies.extend(slice_bodies)
+    return subjects, bodies
+
+
+# Per worker cache of (subject, body) templates for lazily rendered jobs
+JOB_TEMPLATE_CACHE_SIZE = 256
+_job_templates: "OrderedDict[int, tuple[CompiledTemplate, CompiledTemplate]]" = OrderedDict()
+
+
+def job_templates(job: EmailJob) -> tuple[CompiledTemplate, CompiledTemplate]:
+    """Compiled (subject, body) templates of a job, compiled once per worker."""
+    templates = _job_templates.get(job.id)
+    if templates is None:
+        templates = (
+            CompiledTemplate(job.subject_template),
+            CompiledTemplate(job.prompt_template),
+        )
+        _job_templates[job.id] = templates
+        if len(_job_templates) > JOB_TEMPLATE_CACHE_SIZE:
+            _job_templates.popitem(last=False)
+    else:
+        _job_templates.move_to_end(job.id)
+    return templates
+
+
+def lazy_tasks_by_job(jobs: list[tuple[EmailJob, Dataset]], tasks: list[EmailTask]) -> dict:
+    """Group the tasks of lazily rendered jobs as ``{job_id: (job, dataset, tasks)}``."""
+    lazy = {
+        job.id: (job, dataset, [])
+        for job, dataset in jobs
+        if job.lazy_render
+    }
+    for task in tasks:
+        if task.job_id in lazy:
+            lazy[task.job_id][2].append(task)
+    return lazy
+
+
+def lazy_rows_query(lazy: dict):
+    """Select the dataset rows the grouped lazy tasks render from, in one query."""
+    return select(DatasetRow.id, DatasetRow.row_data).where(
+        DatasetRow.id.in_({
+            task.dataset_row_id
+            for _, _, tasks in lazy.values()
+            for task in tasks
+        })
+    )
+
+
+def render_lazy_tasks(lazy: dict, rows: dict[int, dict | list]):
+    """
+    Fill rendered_subject/rendered_body of lazy tasks from their dataset rows.
+
+    The values are set as already committed state, so they are used by the
+    provider but never written back to email_tasks.
+    """
+    for job, dataset, tasks in lazy.values():
+        subject_template, body_template = job_templates(job)
+        for task in tasks:
+            data = dataset.decode_row(rows[task.dataset_row_id])
+            set_committed_value(task, "rendered_subject", subject_template.render(data))
+            set_committed_value(task, "rendered_body", body_template.render(data))
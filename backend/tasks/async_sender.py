@@ -0,0 +1,167 @@
+# tasks/async_sender.py
+
+import asyncio
+import logging
+import os
+import sys
+
+import httpx
+from sqlalchemy import insert, select
+from dotenv import load_dotenv
+
+from analytics.base import count_events
+from analytics.factory import record_job_counts
+from db.db_connection import AsyncSessionLocal
+from db.db_models import (
+    Dataset,
+    EmailAccount,
+    EmailEvent,
+    EmailJob,
+    EmailTask,
+)
+from email_providers.factory import async_provider_factory
+from services.email_service import build_send_results, send_results_update
+from services.templates import lazy_rows_query, lazy_tasks_by_job, render_lazy_tasks
+from services.task_leases import LeaseHeartbeat, take_tasks_query, worker_id
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Concurrent provider requests allowed per sending EmailAccount
+SENDER_CONCURRENCY = int(os.getenv("SENDER_CONCURRENCY", "20"))
+SENDER_HTTP_TIMEOUT = float(os.getenv("SENDER_HTTP_TIMEOUT", "30"))
+
+
+class AsyncSendingEngine:
+    """
+    Sends EmailTasks over one pooled ``httpx.AsyncClient``.
+
+    Requests to the same EmailAccount are bounded by a per-account
+    semaphore, so one engine can keep many keep-alive connections busy
+    without exceeding what a single provider account tolerates. Use it
+    as an async context manager so the HTTP pool is closed on exit.
+    """
+
+    def __init__(self, concurrency_per_account: int = SENDER_CONCURRENCY):
+        self.concurrency_per_account = concurrency_per_account
+        self.client: httpx.AsyncClient | None = None
+        self._limits: dict[int, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            timeout=SENDER_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=self.concurrency_per_account * 4,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    def _limit_for(self, account_id: int) -> asyncio.Semaphore:
+        if account_id not in self._limits:
+            self._limits[account_id] = asyncio.Semaphore(self.concurrency_per_account)
+        return self._limits[account_id]
+
+    async def send_batch(self, email_task_ids: list[int], final: bool = False) -> dict[int, Exception]:
+        """
+        Send the given tasks and record their results; return the errors keyed by task id.
+
+        ``final`` marks the last attempt, whose failures get a "failed" event.
+        Tasks are taken and their leases extended as in ``send_email_batch``.
+        """
+        owner = worker_id()
+        async with AsyncSessionLocal() as db:
+            taken = (await db.execute(take_tasks_query(email_task_ids, owner))).scalars().all()
+            await db.commit()
+
+            if not taken:
+                logger.info("[ASYNC SENDER] Batch has nothing left to send, skipping")
+                return {}
+
+            tasks = (await db.execute(
+                select(EmailTask)
+                .where(EmailTask.id.in_(taken))
+                .order_by(EmailTask.id)
+            )).scalars().all()
+
+            jobs = (await db.execute(
+                select(EmailJob, EmailAccount, Dataset)
+                .join(EmailAccount, EmailAccount.id == EmailJob.email_account_id)
+                .join(Dataset, Dataset.id == EmailJob.dataset_id)
+                .where(EmailJob.id.in_({task.job_id for task in tasks}))
+            )).all()
+
+            lazy = lazy_tasks_by_job([(job, dataset) for job, _, dataset in jobs], tasks)
+            if lazy:
+                rows = (await db.execute(lazy_rows_query(lazy))).all()
+                render_lazy_tasks(lazy, dict(rows))
+
+            per_job: dict[int, list[EmailTask]] = {}
+            for task in tasks:
+                per_job.setdefault(task.job_id, []).append(task)
+
+            sends = []
+            for job, account, _ in jobs:
+                adapter = async_provider_factory(account, self.client)
+                sends.append(
+                    adapter.send_many(per_job[job.id], self._limit_for(account.id))
+                )
+
+            errors = {}
+            with LeaseHeartbeat(taken, owner):
+                for job_errors in await asyncio.gather(*sends):
+                    errors.update(job_errors)
+
+            status_rows, event_rows = build_send_results(tasks, errors, final, owner)
+            await db.execute(send_results_update(), status_rows)
+            if event_rows:
+                await db.execute(insert(EmailEvent), event_rows)
+            await db.commit()
+
+        # an in-process buffer may flush through the sync engine
+        await asyncio.to_thread(record_job_counts, count_events(
+            (row["email_job_id"], row["event_type"]) for row in event_rows
+        ))
+
+        logger.info(
+            "[ASYNC SENDER] ✓ Batch done sent=%d failed=%d",
+            len(tasks) - len(errors),
+            len(errors),
+        )
+        return errors
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_engine: AsyncSendingEngine | None = None
+
+
+def send_batch_blocking(email_task_ids: list[int], final: bool = False) -> dict[int, Exception]:
+    """
+    Run a batch through the worker's engine from synchronous code (Celery).
+
+    The event loop and the engine are created once per worker process and
+    reused, so HTTP and database connections stay pooled between tasks.
+    """
+    global _loop, _engine
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        _engine = _loop.run_until_complete(AsyncSendingEngine().__aenter__())
+    return _loop.run_until_complete(_engine.send_batch(email_task_ids, final))
+
+
+async def main(email_task_ids: list[int]):
+    async with AsyncSendingEngine() as engine:
+        errors = await engine.send_batch(email_task_ids)
+    if errors:
+        logger.error("[ASYNC SENDER] %d tasks failed: %s", len(errors), sorted(errors))
+
+
+if __name__ == "__main__":
+    # python -m tasks.async_sender <email_task_id> [<email_task_id> ...]
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main([int(task_id) for task_id in sys.argv[1:]]))
@@ -1,9 +1,13 @@
 # tasks/dispatcher.py
 
 import logging
-from datetime import datetime, timedelta
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
 from celery_app import celery_app
-from sqlalchemy import or_, select, func
+from sqlalchemy import and_, or_, select, func, union_all, update
+from sqlalchemy.orm import Session
 from db.db_connection import get_sync_db
 from db.db_models import (
     EmailJob,
@@ -13,132 +17,548 @@ from db.db_models import (
     EmailEvent,
     EmailAccount
 )
+from rate_limiters.factory import get_rate_limiter, job_buckets
+from dispatcher.fair_queue import fair_budgets, interleave
+from dispatcher.metrics import dispatch_latency
+from services.task_leases import LeaseHeartbeat, lease_expiry, take_tasks_query, worker_id
+from dotenv import load_dotenv
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# "batched" claims work for every eligible job in a constant number of
+# queries per tick, "per_job" keeps the original one-job-at-a-time loop.
+DISPATCH_MODE = os.getenv("DISPATCH_MODE", "batched")
+
+# Jobs read per pending_heads statement; SQLite refuses compound SELECTs
+# of more than 500 terms
+PENDING_HEADS_BATCH = int(os.getenv("PENDING_HEADS_BATCH", "200"))
+
+# Number of EmailTasks handed to a single tasks.send_email_batch message
+SEND_BATCH_SIZE = int(os.getenv("SEND_BATCH_SIZE", "50"))
+
+# "sync" sends a batch with the blocking provider clients, "async" runs
+# it through the asyncio engine with bounded per-account concurrency.
+SENDER_ENGINE = os.getenv("SENDER_ENGINE", "sync")
+SEND_BATCH_TASKS = {
+    "sync": "tasks.send_email_batch",
+    "async": "tasks.send_email_batch_async",
+}
+
+# "burst" enqueues a job's whole budget at once, "paced" spreads its sends
+# evenly: the job bucket holds only DISPATCH_PACING_WINDOW seconds of
+# tokens, and the tasks claimed in a tick are enqueued with countdowns
+# 60/throttle apart, grouped into messages DISPATCH_PACING_RESOLUTION
+# seconds wide.
+DISPATCH_PACING = os.getenv("DISPATCH_PACING", "burst")
+DISPATCH_PACING_WINDOW = float(os.getenv("DISPATCH_PACING_WINDOW", "1"))
+DISPATCH_PACING_RESOLUTION = float(os.getenv("DISPATCH_PACING_RESOLUTION", "0.1"))
+
+
+def pacing_window() -> float | None:
+    return DISPATCH_PACING_WINDOW if DISPATCH_PACING == "paced" else None
+
+
+# Upper bound on claimed but unsent tasks across all jobs. Each tick claims
+# at most the difference, split fairly between users and their sending
+# accounts; 0 leaves every job its full throttle budget.
+DISPATCH_MAX_IN_FLIGHT = int(os.getenv("DISPATCH_MAX_IN_FLIGHT", "0"))
+
+
+@dataclass
+class DispatchResult:
+    """What a dispatch tick did, used by the dispatcher service to decide when to wake."""
+
+    eligible_jobs: int = 0
+    claimed: int = 0
+    # seconds until a job that used its whole budget gets its next token
+    next_refill: float | None = None
+
+
 @celery_app.task(name="tasks.dispatch_emails")
 def dispatch_emails():
-    now = datetime.utcnow()
+    run_dispatch(datetime.utcnow())
+
+
+def run_dispatch(now: datetime, due_job_ids: set[int] | None = None) -> DispatchResult:
+    """
+    One dispatch tick; shared by the beat task and dispatcher.service.
+
+    ``due_job_ids`` are the SCHEDULED jobs the caller knows became
+    eligible (dispatcher.service keeps them in a ScheduleIndex); when
+    given, only those and the RUNNING jobs are loaded instead of
+    filtering every SCHEDULED job by ``scheduled_at``.
+    """
     logger.info("[DISPATCHER] Tick at %s", now.isoformat())
 
     with get_sync_db() as db:
-        jobs = db.execute(
-            select(EmailJob).where(
-                EmailJob.status.in_(
-                    [EmailJobStatus.SCHEDULED, EmailJobStatus.RUNNING]
+        if DISPATCH_MODE == "per_job":
+            result = _dispatch_per_job(db, now, due_job_ids)
+        else:
+            result = _dispatch_batched(db, now, due_job_ids)
+
+    dispatch_latency.maybe_log()
+    logger.info("[DISPATCHER] Cycle complete")
+    return result
+
+
+def _eligible_jobs_query(now: datetime, due_job_ids: set[int] | None = None):
+    query = select(EmailJob, EmailAccount.provider).join(
+        EmailAccount, EmailAccount.id == EmailJob.email_account_id
+    )
+    if due_job_ids is not None:
+        return query.where(
+            or_(
+                EmailJob.status == EmailJobStatus.RUNNING,
+                and_(
+                    EmailJob.id.in_(due_job_ids),
+                    EmailJob.status == EmailJobStatus.SCHEDULED,
                 ),
-                or_(
-                    EmailJob.scheduled_at.is_(None),
-                    EmailJob.scheduled_at <= now,
-                )                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                        ,
             )
-        ).scalars().all()
+        )
+    return query.where(
+        EmailJob.status.in_(
+            [EmailJobStatus.SCHEDULED, EmailJobStatus.RUNNING]
+        ),
+        or_(
+            EmailJob.scheduled_at.is_(None),
+            EmailJob.scheduled_at <= now,
+        ),
+    )
+
+
+def _dispatch_batched(
+    db: Session, now: datetime, due_job_ids: set[int] | None = None
+) -> DispatchResult:
+    """
+    Dispatch one tick for all eligible jobs using set-based queries.
+
+    The number of statements is fixed regardless of how many jobs are
+    active: load jobs, flip new jobs to RUNNING, claim pending tasks for
+    every job in one UPDATE. Throttle budgets come from the rate limiter
+    instead of counting recent "sent" events.
+    """
+    rows = db.execute(_eligible_jobs_query(now, due_job_ids)).all()
+
+    if not rows:
+        logger.debug("[DISPATCHER] No eligible jobs found")
+        return DispatchResult()
+
+    logger.info("[DISPATCHER] Found %d eligible jobs", len(rows))
+    result = DispatchResult(eligible_jobs=len(rows))
+
+    # only take tokens for tasks a job actually has waiting, so drained
+    # jobs don't empty the buckets they share with their account
+    throttles = {job.id: job.throttle_per_minute or 60 for job, _ in rows}
+    demand = pending_demand(db, throttles)
+    complete_finished_jobs(db, [job_id for job_id in throttles if not demand.get(job_id)])
+
+    limiter = get_rate_limiter()
+    budgets = {}
+    buckets = {}
+    for job, provider in rows:
+        if not demand.get(job.id):
+            continue
+        buckets[job.id] = job_buckets(job, provider, pacing_window())
+        remaining_budget = limiter.acquire_all(buckets[job.id], demand[job.id])
+
+        if remaining_budget <= 0:
+            logger.info(
+                "[DISPATCHER] Job %s throttled, skipping",
+                job.id,
+            )
+            continue
+
+        budgets[job.id] = remaining_budget
+
+    jobs = {job.id: job for job, _ in rows}
+    if budgets and DISPATCH_MAX_IN_FLIGHT > 0:
+        budgets = share_capacity(db, jobs, budgets, buckets, limiter)
+
+    new_jobs = [job for job, _ in rows if job.status != EmailJobStatus.RUNNING]
+    new_job_ids = [job.id for job in new_jobs]
+    if new_job_ids:
+        db.execute(
+            update(EmailJob)
+            .where(EmailJob.id.in_(new_job_ids))
+            .values(status=EmailJobStatus.RUNNING)
+            .execution_options(synchronize_session=False)
+        )
+        logger.info(
+            "[DISPATCHER] Jobs %s status -> RUNNING",
+            new_job_ids,
+        )
 
-        if not jobs:
-            logger.debug("[DISPATCHER] No eligible jobs found")
-            return
+    claimed = claim_pending_tasks(db, budgets) if budgets else []
+    db.commit()
+
+    # hand back tokens for budget a job had no pending tasks to use
+    claimed_per_job = Counter(job_id for _, job_id in claimed)
+    for job_id, budget in budgets.items():
+        limiter.release_all(buckets[job_id], budget - claimed_per_job[job_id])
+
+    # jobs with a full minute of work left that used all of their budget
+    # have more to send once it refills
+    refills = [
+        60 / throttles[job.id]
+        for job, _ in rows
+        if demand.get(job.id, 0) >= throttles[job.id]
+        and (job.id not in budgets or claimed_per_job[job.id] == budgets[job.id])
+    ]
+    result.next_refill = min(refills, default=None)
+    result.claimed = len(claimed)
+
+    # from becoming eligible (scheduled time, or creation) to being picked up
+    for job in new_jobs:
+        dispatch_latency.record(now, job.scheduled_at or job.created_at)
+
+    if not claimed:
+        logger.info("[DISPATCHER] No pending tasks to dispatch")
+        return result
+
+    logger.info(
+        "[DISPATCHER] Dispatching %d tasks across %d jobs",
+        len(claimed),
+        len(claimed_per_job),
+    )
+
+    enqueue_send_batches(claimed, jobs)
+    return result
+
+
+def tenant_paths(jobs: dict[int, EmailJob]) -> dict[int, tuple]:
+    """Who each job's sends are shared fairly with: its user, then its sending account."""
+    return {job_id: (job.user_id, job.email_account_id) for job_id, job in jobs.items()}
+
+
+def job_weights(jobs: dict[int, EmailJob]) -> dict[int, float]:
+    return {job_id: max(job.priority or 1, 1) for job_id, job in jobs.items()}
+
+
+def share_capacity(
+    db: Session,
+    jobs: dict[int, EmailJob],
+    budgets: dict[int, int],
+    buckets: dict[int, list],
+    limiter,
+) -> dict[int, int]:
+    """
+    Cut this tick's budgets down to the free DISPATCH_MAX_IN_FLIGHT capacity.
+
+    The capacity is split with weighted fair sharing across users, then
+    accounts, then jobs (see dispatcher.fair_queue), and the tokens a job
+    was cut by go back to its rate limiter buckets.
+    """
+    in_flight = db.execute(
+        select(func.count())
+        .select_from(EmailTask)
+        .where(
+            EmailTask.job_id.in_(list(jobs)),
+            EmailTask.status == EmailTaskStatus.IN_PROGRESS,
+        )
+    ).scalar()
+    capacity = max(0, DISPATCH_MAX_IN_FLIGHT - in_flight)
+
+    shares = fair_budgets(budgets, tenant_paths(jobs), job_weights(jobs), capacity)
+    for job_id, budget in budgets.items():
+        limiter.release_all(buckets[job_id], budget - shares[job_id])
+
+    logger.info(
+        "[DISPATCHER] %d tasks in flight, sharing %d across %d jobs",
+        in_flight,
+        capacity,
+        len(budgets),
+    )
+    return {job_id: share for job_id, share in shares.items() if share > 0}
+
+
+def enqueue_send_batches(
+    claimed: list[tuple[int, int]],
+    jobs: dict[int, EmailJob] | None = None,
+):
+    """
+    Enqueue send batch messages of up to SEND_BATCH_SIZE tasks of one job.
+
+    With ``jobs``, batches of different users and accounts are interleaved
+    by weighted fair queuing, so a small job's first batch isn't queued
+    behind every batch of a large one.
+    """
+    per_job: dict[int, list[int]] = {}
+    for task_id, job_id in claimed:
+        per_job.setdefault(job_id, []).append(task_id)
+
+    batches = {}
+    for job_id, task_ids in per_job.items():
+        if jobs and DISPATCH_PACING == "paced":
+            batches[job_id] = paced_batches(job_id, task_ids, jobs[job_id].throttle_per_minute or 60)
+        else:
+            batches[job_id] = [
+                (job_id, task_ids[start:start + SEND_BATCH_SIZE], None)
+                for start in range(0, len(task_ids), SEND_BATCH_SIZE)
+            ]
+
+    if jobs:
+        ordered = interleave(batches, tenant_paths(jobs), job_weights(jobs))
+    else:
+        ordered = [batch for job_batches in batches.values() for batch in job_batches]
+
+    for job_id, chunk, countdown in ordered:
+        celery_app.send_task(
+            SEND_BATCH_TASKS[SENDER_ENGINE],
+            args=[chunk],
+            queue="emails",
+            countdown=countdown,
+        )
+        logger.debug(
+            "[DISPATCHER] Enqueued batch of %d tasks job_id=%s countdown=%s",
+            len(chunk),
+            job_id,
+            countdown,
+        )
 
-        logger.info("[DISPATCHER] Found %d eligible jobs", len(jobs))
 
-        for job in jobs:
-            logger.info(
-                "[DISPATCHER] Processing job_id=%s status=%s",
-                job.id,
-                job.status.value,
+def paced_batches(job_id: int, task_ids: list[int], throttle: int) -> list[tuple]:
+    """
+    Split a job's claimed tasks into ``(job_id, task_ids, countdown)`` batches.
+
+    Task ``i`` is due ``i * 60 / throttle`` seconds from now; tasks due
+    within the same DISPATCH_PACING_RESOLUTION slot share a message.
+    """
+    interval = 60 / throttle
+    # slots per second; the slot is computed in integers, flooring the
+    # float quotient puts e.g. 3 * 0.3 / 0.1 = 8.999... in the wrong slot
+    steps = round(1 / DISPATCH_PACING_RESOLUTION) if DISPATCH_PACING_RESOLUTION > 0 else 0
+    batches = []
+    for position, task_id in enumerate(task_ids):
+        due = position * interval
+        slot = position * 60 * steps // throttle if steps else position
+        if batches and batches[-1][0] == slot and len(batches[-1][1]) < SEND_BATCH_SIZE:
+            batches[-1][1].append(task_id)
+        else:
+            batches.append((slot, [task_id], due))
+    return [(job_id, chunk, due or None) for _, chunk, due in batches]
+
+
+def pending_heads(limits: dict[int, int]):
+    """
+    Subquery of ``(id, job_id)`` of the first ``limits[job_id]`` PENDING tasks per job.
+
+    Each job gets its own ``ORDER BY id LIMIT n`` select, glued with
+    UNION ALL, so the (job_id, status, id) index stops after ``n`` rows
+    however large the job's backlog is. Takes at most
+    PENDING_HEADS_BATCH jobs, see ``pending_head_batches``.
+    """
+    heads = [
+        select(EmailTask.id, EmailTask.job_id)
+        .where(
+            EmailTask.job_id == job_id,
+            EmailTask.status == EmailTaskStatus.PENDING,
+        )
+        .order_by(EmailTask.id)
+        .limit(limit)
+        .subquery()
+        for job_id, limit in limits.items()
+    ]
+    return union_all(*(select(head.c.id, head.c.job_id) for head in heads)).subquery()
+
+
+def pending_head_batches(limits: dict[int, int]):
+    """Split ``limits`` into ``pending_heads`` sized chunks, skipping jobs without budget."""
+    items = [(job_id, limit) for job_id, limit in limits.items() if limit > 0]
+    for start in range(0, len(items), PENDING_HEADS_BATCH):
+        yield dict(items[start:start + PENDING_HEADS_BATCH])
+
+
+def pending_demand(db: Session, limits: dict[int, int]) -> dict[int, int]:
+    """PENDING tasks per job, counting no further than ``limits[job_id]``."""
+    demand = {}
+    for batch in pending_head_batches(limits):
+        heads = pending_heads(batch)
+        demand.update(db.execute(
+            select(heads.c.job_id, func.count()).group_by(heads.c.job_id)
+        ).all())
+    return demand
+
+
+def complete_finished_jobs(db: Session, job_ids: list[int]) -> list[int]:
+    """
+    Mark COMPLETED the RUNNING, fully materialized jobs among ``job_ids``
+    that have no PENDING or IN_PROGRESS task left; return their ids.
+
+    Finished jobs then drop out of the eligible jobs query.
+    """
+    if not job_ids:
+        return []
+
+    unfinished = select(EmailTask.id).where(
+        EmailTask.job_id == EmailJob.id,
+        EmailTask.status.in_([EmailTaskStatus.PENDING, EmailTaskStatus.IN_PROGRESS]),
+    )
+    completed = db.execute(
+        update(EmailJob)
+        .where(
+            EmailJob.id.in_(job_ids),
+            EmailJob.status == EmailJobStatus.RUNNING,
+            EmailJob.materialized_at.is_not(None),
+            ~unfinished.exists(),
+        )
+        .values(status=EmailJobStatus.COMPLETED)
+        .returning(EmailJob.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    if completed:
+        logger.info("[DISPATCHER] Jobs %s status -> COMPLETED", sorted(completed))
+    return completed
+
+
+def claim_pending_tasks(db: Session, budgets: dict[int, int]) -> list[tuple[int, int]]:
+    """
+    Move up to ``budgets[job_id]`` PENDING tasks per job to IN_PROGRESS.
+
+    The first tasks of every job by id are read with ``pending_heads``
+    and claimed with one UPDATE ... RETURNING per PENDING_HEADS_BATCH
+    jobs. The status check in the UPDATE keeps concurrent dispatchers
+    from claiming the same row twice. Returns ``(task_id, job_id)``
+    pairs ordered by task id.
+    """
+    rows = []
+    for batch in pending_head_batches(budgets):
+        claimable = select(pending_heads(batch).c.id)
+        rows.extend(db.execute(
+            update(EmailTask)
+            .where(
+                EmailTask.id.in_(claimable),
+                EmailTask.status == EmailTaskStatus.PENDING,
+            )
+            .values(
+                status=EmailTaskStatus.IN_PROGRESS,
+                claimed_by=None,
+                lease_expires_at=lease_expiry(),
             )
+            .returning(EmailTask.id, EmailTask.job_id)
+            .execution_options(synchronize_session=False)
+        ).all())
 
-            if job.status != EmailJobStatus.RUNNING:
-                job.status = EmailJobStatus.RUNNING
-                db.commit()
-                logger.info(
-                    "[DISPATCHER] Job %s status -> RUNNING",
-                    job.id,
-                )
+    return sorted((row.id, row.job_id) for row in rows)
 
-            throttle = job.throttle_per_minute or 60
-            window_start = now - timedelta(seconds=60)
 
-            sent_count = db.execute(
-                select(func.count())
-                .select_from(EmailEvent)
-                .where(
-                    EmailEvent.email_job_id == job.id,
-                    EmailEvent.event_type == "sent",
-                    EmailEvent.created_at >= window_start,
-                )
-            ).scalar()
+def _dispatch_per_job(
+    db: Session, now: datetime, due_job_ids: set[int] | None = None
+) -> DispatchResult:
+    rows = db.execute(_eligible_jobs_query(now, due_job_ids)).all()
+
+    if not rows:
+        logger.debug("[DISPATCHER] No eligible jobs found")
+        return DispatchResult()
+
+    logger.info("[DISPATCHER] Found %d eligible jobs", len(rows))
+    result = DispatchResult(eligible_jobs=len(rows))
 
-            remaining_budget = throttle - sent_count
+    limiter = get_rate_limiter()
 
+    for job, provider in rows:
+        logger.info(
+            "[DISPATCHER] Processing job_id=%s status=%s",
+            job.id,
+            job.status.value,
+        )
+
+        if job.status != EmailJobStatus.RUNNING:
+            job.status = EmailJobStatus.RUNNING
+            db.commit()
+            dispatch_latency.record(now, job.scheduled_at or job.created_at)
             logger.info(
-                "[DISPATCHER] Job %s throttle=%d sent_last_min=%d remaining=%d",
+                "[DISPATCHER] Job %s status -> RUNNING",
                 job.id,
-                throttle,
-                sent_count,
-                remaining_budget,
             )
 
-            if remaining_budget <= 0:
-                logger.info(
-                    "[DISPATCHER] Job %s throttled, skipping",
-                    job.id,
-                )
-                continue
+        throttle = job.throttle_per_minute or 60
+        pending = pending_demand(db, {job.id: throttle}).get(job.id, 0)
+        if not pending:
+            complete_finished_jobs(db, [job.id])
+            db.commit()
+            logger.info(
+                "[DISPATCHER] Job %s has no pending tasks",
+                job.id,
+            )
+            continue
 
-            tasks = db.execute(
-                select(EmailTask)
-                .where(
-                    EmailTask.job_id == job.id,
-                    EmailTask.status == EmailTaskStatus.PENDING,
-                )
-                .order_by(EmailTask.id)
-                .limit(remaining_budget)
-                .with_for_update(skip_locked=True)
-            ).scalars().all()
+        buckets = job_buckets(job, provider, pacing_window())
+        remaining_budget = limiter.acquire_all(buckets, pending)
 
-            if not tasks:
-                logger.info(
-                    "[DISPATCHER] Job %s has no pending tasks",
-                    job.id,
-                )
-                continue
+        logger.info(
+            "[DISPATCHER] Job %s throttle=%d remaining=%d",
+            job.id,
+            throttle,
+            remaining_budget,
+        )
 
+        if remaining_budget <= 0:
             logger.info(
-                "[DISPATCHER] Dispatching %d tasks for job %s",
-                len(tasks),
+                "[DISPATCHER] Job %s throttled, skipping",
                 job.id,
             )
+            continue
 
-            for task in tasks:
-                task.status = EmailTaskStatus.IN_PROGRESS
-                celery_app.send_task(
-                    "tasks.send_single_email",
-                    args=[task.id],
-                    queue="emails",
-                )
-                logger.debug(
-                    "[DISPATCHER] Enqueued task_id=%s job_id=%s",
-                    task.id,
-                    job.id,
-                )
+        tasks = db.execute(
+            select(EmailTask)
+            .where(
+                EmailTask.job_id == job.id,
+                EmailTask.status == EmailTaskStatus.PENDING,
+            )
+            .order_by(EmailTask.id)
+            .limit(remaining_budget)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
 
-            db.commit()
+        limiter.release_all(buckets, remaining_budget - len(tasks))
+
+        if not tasks:
+            logger.info(
+                "[DISPATCHER] Job %s has no pending tasks",
+                job.id,
+            )
+            continue
 
-        logger.info("[DISPATCHER] Cycle complete")
+        logger.info(
+            "[DISPATCHER] Dispatching %d tasks for job %s",
+            len(tasks),
+            job.id,
+        )
+
+        lease_expires_at = lease_expiry()
+        for task in tasks:
+            task.status = EmailTaskStatus.IN_PROGRESS
+            task.claimed_by = None
+            task.lease_expires_at = lease_expires_at
+
+        db.commit()
+        enqueue_send_batches([(task.id, job.id) for task in tasks], {job.id: job})
+        result.claimed += len(tasks)
+
+    return result
 # tasks/sender.py
 
 import logging
 from datetime import datetime
 from celery_app import celery_app
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from db.db_connection import get_sync_db
 from db.db_models import (
+    Dataset,
     EmailTask,
     EmailTaskStatus,
     EmailJob,
     EmailEvent,
 )
-from services.email_service import send_email
+from email_providers.factory import provider_factory
+from services.templates import lazy_rows_query, lazy_tasks_by_job, render_lazy_tasks
+from services.email_service import build_send_results, send_email, send_results_update
+from analytics.base import count_events
+from analytics.factory import record_job_counts
+from tasks.async_sender import send_batch_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -171,6 +591,10 @@ def send_single_email(self, email_task_id: int):
                 select(EmailJob).where(EmailJob.id == task.job_id)
             ).scalar_one()
             account = db.execute(select(EmailAccount).where(EmailAccount.id==job.email_account_id)).scalar_one()
+
+            if job.lazy_render:
+                lazy = lazy_tasks_by_job([(job, db.get(Dataset, job.dataset_id))], [task])
+                render_lazy_tasks(lazy, dict(db.execute(lazy_rows_query(lazy)).all()))
             logger.info(
                 "[SENDER] Sending email task_id=%s job_id=%s recipient=%s",
                 task.id,
@@ -195,6 +619,7 @@ def send_single_email(self, email_task_id: int):
 
             db.add(event)
             db.commit()
+            record_job_counts(count_events([(job.id, "sent")]))
 
             logger.info(
                 "[SENDER] ✓ Sent task_id=%s recipient=%s",
@@ -228,3 +653,113 @@ def send_single_email(self, email_task_id: int):
             exc=exc,
             countdown=60 * (2 ** self.request.retries),
         )
+
+
+@celery_app.task(bind=True, max_retries=3, name="tasks.send_email_batch")
+def send_email_batch(self, email_task_ids: list[int]):
+    """
+    Send a chunk of EmailTasks with one session and one provider client per account.
+
+    Tasks, jobs and accounts are loaded with one query each, and all
+    status changes and "sent" events are written back in bulk. Tasks that
+    fail are marked FAILED and retried together as a smaller batch.
+
+    Only tasks nobody holds are taken (see services.task_leases), and
+    their leases are extended while the batch is being sent.
+    """
+    logger.info("[SENDER] Start batch of %d tasks", len(email_task_ids))
+    owner = worker_id()
+
+    with get_sync_db() as db:
+        taken = db.execute(take_tasks_query(email_task_ids, owner)).scalars().all()
+        db.commit()
+
+        if not taken:
+            logger.info("[SENDER] Batch has nothing left to send, skipping")
+            return
+
+        tasks = db.execute(
+            select(EmailTask)
+            .where(EmailTask.id.in_(taken))
+            .order_by(EmailTask.id)
+        ).scalars().all()
+
+        jobs = db.execute(
+            select(EmailJob, EmailAccount, Dataset)
+            .join(EmailAccount, EmailAccount.id == EmailJob.email_account_id)
+            .join(Dataset, Dataset.id == EmailJob.dataset_id)
+            .where(EmailJob.id.in_({task.job_id for task in tasks}))
+        ).all()
+        providers = {job.id: provider_factory(account) for job, account, _ in jobs}
+
+        lazy = lazy_tasks_by_job([(job, dataset) for job, _, dataset in jobs], tasks)
+        if lazy:
+            render_lazy_tasks(lazy, dict(db.execute(lazy_rows_query(lazy)).all()))
+
+        with LeaseHeartbeat(taken, owner):
+            errors = send_tasks(providers, tasks)
+        final = self.request.retries >= self.max_retries
+        event_rows = record_send_results(db, tasks, errors, final, owner)
+        db.commit()
+
+    record_job_counts(count_events(
+        (row["email_job_id"], row["event_type"]) for row in event_rows
+    ))
+
+    logger.info(
+        "[SENDER] ✓ Batch done sent=%d failed=%d",
+        len(tasks) - len(errors),
+        len(errors),
+    )
+
+    if errors:
+        raise self.retry(
+            args=[sorted(errors)],
+            exc=next(iter(errors.values())),
+            countdown=60 * (2 ** self.request.retries),
+        )
+
+
+@celery_app.task(bind=True, max_retries=3, name="tasks.send_email_batch_async")
+def send_email_batch_async(self, email_task_ids: list[int]):
+    """Same contract as ``send_email_batch``, sending through the asyncio engine."""
+    logger.info("[SENDER] Start async batch of %d tasks", len(email_task_ids))
+
+    errors = send_batch_blocking(
+        email_task_ids,
+        final=self.request.retries >= self.max_retries,
+    )
+
+    if errors:
+        raise self.retry(
+            args=[sorted(errors)],
+            exc=next(iter(errors.values())),
+            countdown=60 * (2 ** self.request.retries),
+        )
+
+
+def send_tasks(providers: dict, tasks: list[EmailTask]) -> dict[int, Exception]:
+    """Send tasks grouped by job through that job's provider; return the errors keyed by task id."""
+    per_job: dict[int, list[EmailTask]] = {}
+    for task in tasks:
+        per_job.setdefault(task.job_id, []).append(task)
+
+    errors = {}
+    for job_id, job_tasks in per_job.items():
+        errors.update(providers[job_id].send_many(job_tasks))
+    return errors
+
+
+def record_send_results(
+    db: Session,
+    tasks: list[EmailTask],
+    errors: dict[int, Exception],
+    final: bool = False,
+    owner: str | None = None,
+) -> list[dict]:
+    """Write statuses for a sent batch and its events using two bulk statements; return the events."""
+    status_rows, event_rows = build_send_results(tasks, errors, final, owner)
+    db.execute(send_results_update(), status_rows)
+    if event_rows:
+        db.execute(insert(EmailEvent), event_rows)
+    return event_rows
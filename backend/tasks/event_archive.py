@@ -0,0 +1,147 @@
+# tasks/event_archive.py
+
+import gzip, json, logging, os
+from datetime import datetime, timedelta
+from itertools import takewhile
+from celery_app import celery_app
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from db.db_connection import PROJECT_ROOT, get_sync_db
+from db.db_models import EmailEvent, EmailEventAggregate
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Days raw email_events stay in the database before being archived
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", "30"))
+# Directory archived events are written to as gzipped JSON lines
+EVENT_ARCHIVE_DIR = os.getenv(
+    "EVENT_ARCHIVE_DIR",
+    os.path.join(PROJECT_ROOT, "archive", "email_events"),
+)
+# Events archived per file and per transaction
+EVENT_ARCHIVE_BATCH_SIZE = int(os.getenv("EVENT_ARCHIVE_BATCH_SIZE", "10000"))
+
+
+def write_archive(events: list) -> str:
+    """
+    Write a batch of events to ``<dir>/<YYYY-MM>/events-<first id>-<last id>.jsonl.gz``.
+
+    The file is written under a temporary name and renamed into place, so
+    a batch whose transaction failed is simply overwritten on the next run.
+    """
+    directory = os.path.join(EVENT_ARCHIVE_DIR, events[0].created_at.strftime("%Y-%m"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"events-{events[0].id}-{events[-1].id}.jsonl.gz")
+
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps({
+                "id": event.id,
+                "email_task_id": event.email_task_id,
+                "email_job_id": event.email_job_id,
+                "event_type": event.event_type,
+                "payload": event.payload,
+                "created_at": event.created_at.isoformat(),
+            }))
+            f.write("\n")
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def compact_events(db: Session, events: list):
+    """Add a batch of events to the daily (job, event_type) aggregates."""
+    batch: dict[tuple, list] = {}
+    for event in events:
+        key = (event.email_job_id, event.event_type, event.created_at.date())
+        counts = batch.get(key)
+        if counts is None:
+            batch[key] = [1, event.created_at, event.created_at]
+        else:
+            counts[0] += 1
+            counts[1] = min(counts[1], event.created_at)
+            counts[2] = max(counts[2], event.created_at)
+
+    existing = {
+        (row.email_job_id, row.event_type, row.day): row
+        for row in db.execute(
+            select(EmailEventAggregate).where(
+                EmailEventAggregate.email_job_id.in_({key[0] for key in batch}),
+                EmailEventAggregate.day.in_({key[2] for key in batch}),
+            )
+        ).scalars()
+    }
+
+    updates, inserts = [], []
+    for key, (count, first_at, last_at) in batch.items():
+        row = existing.get(key)
+        if row is None:
+            inserts.append({
+                "email_job_id": key[0],
+                "event_type": key[1],
+                "day": key[2],
+                "count": count,
+                "first_at": first_at,
+                "last_at": last_at,
+            })
+        else:
+            updates.append({
+                "id": row.id,
+                "count": row.count + count,
+                "first_at": min(row.first_at, first_at),
+                "last_at": max(row.last_at, last_at),
+            })
+
+    if updates:
+        db.execute(update(EmailEventAggregate), updates)
+    if inserts:
+        db.execute(insert(EmailEventAggregate), inserts)
+
+
+@celery_app.task(name="tasks.archive_email_events")
+def archive_email_events():
+    """
+    Move email_events older than EVENT_RETENTION_DAYS out of the database.
+
+    Events are append-only, so id order is creation order: batches are
+    read from the lowest id and stop at the first event inside the
+    retention window, which keeps every read on the primary key. Each
+    batch is written to a compressed file first, then compacted into
+    EmailEventAggregate and deleted in one transaction.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=EVENT_RETENTION_DAYS)
+    archived = 0
+
+    with get_sync_db() as db:
+        while True:
+            events = db.execute(
+                select(
+                    EmailEvent.id,
+                    EmailEvent.email_task_id,
+                    EmailEvent.email_job_id,
+                    EmailEvent.event_type,
+                    EmailEvent.payload,
+                    EmailEvent.created_at,
+                )
+                .order_by(EmailEvent.id)
+                .limit(EVENT_ARCHIVE_BATCH_SIZE)
+            ).all()
+
+            expired = list(takewhile(lambda event: event.created_at < cutoff, events))
+            if not expired:
+                break
+
+            path = write_archive(expired)
+            compact_events(db, expired)
+            db.execute(delete(EmailEvent).where(EmailEvent.id <= expired[-1].id))
+            db.commit()
+
+            archived += len(expired)
+            logger.info("[ARCHIVE] %d events up to id %s -> %s", len(expired), expired[-1].id, path)
+
+            if len(expired) < EVENT_ARCHIVE_BATCH_SIZE:
+                break
+
+    logger.info("[ARCHIVE] Archived %d events older than %s", archived, cutoff)
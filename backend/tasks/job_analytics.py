@@ -0,0 +1,73 @@
+# tasks/job_analytics.py
+
+import logging
+from collections import Counter
+from celery_app import celery_app
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+from analytics.base import COUNTER_COLUMNS, EVENT_COUNTERS
+from analytics.factory import flush_job_analytics as flush_buffered_counts
+from db.db_connection import get_sync_db
+from db.db_models import EmailEvent, EmailEventAggregate, EmailJob, EmailJobAnalytics
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="tasks.flush_job_analytics")
+def flush_job_analytics():
+    jobs = flush_buffered_counts()
+    if jobs:
+        logger.info("[ANALYTICS] Flushed counters of %d jobs", jobs)
+
+
+def count_job_events(db: Session, job_id: int) -> dict[str, int]:
+    """Counter values of a job rebuilt from archived aggregates and raw events."""
+    per_type = union_all(
+        select(EmailEventAggregate.event_type, EmailEventAggregate.count.label("n"))
+        .where(EmailEventAggregate.email_job_id == job_id),
+        select(EmailEvent.event_type, func.count().label("n"))
+        .where(EmailEvent.email_job_id == job_id)
+        .group_by(EmailEvent.event_type),
+    ).subquery()
+
+    counts = Counter()
+    for event_type, n in db.execute(
+        select(per_type.c.event_type, func.sum(per_type.c.n)).group_by(per_type.c.event_type)
+    ):
+        column = EVENT_COUNTERS.get(event_type)
+        if column:
+            counts[column] += int(n)
+    return {column: counts[column] for column in COUNTER_COLUMNS}
+
+
+@celery_app.task(name="tasks.rebuild_job_analytics")
+def rebuild_job_analytics(job_id: int | None = None):
+    """
+    Recompute EmailJobAnalytics from email_event_aggregates and email_events.
+
+    Rebuilds one job, or every job when ``job_id`` is None. Counters are
+    flushed first so buffered increments are not applied on top of the
+    rebuilt values later.
+    """
+    flush_buffered_counts()
+
+    with get_sync_db() as db:
+        if job_id is None:
+            job_ids = db.execute(select(EmailJob.id).order_by(EmailJob.id)).scalars().all()
+        else:
+            job_ids = [job_id]
+
+        for current_id in job_ids:
+            counters = count_job_events(db, current_id)
+            analytics = db.execute(
+                select(EmailJobAnalytics).where(EmailJobAnalytics.job_id == current_id)
+            ).scalar_one_or_none()
+
+            if analytics is None:
+                db.add(EmailJobAnalytics(job_id=current_id, **counters))
+            else:
+                for column, value in counters.items():
+                    setattr(analytics, column, value)
+            db.commit()
+
+    logger.info("[ANALYTICS] Rebuilt counters of %d jobs", len(job_ids))
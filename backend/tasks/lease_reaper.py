@@ -0,0 +1,91 @@
+# tasks/lease_reaper.py
+
+import logging
+import os
+from datetime import datetime
+from celery_app import celery_app
+from sqlalchemy import select, update
+from db.db_connection import get_sync_db
+from db.db_models import EmailJob, EmailJobStatus, EmailTask, EmailTaskStatus
+from dispatcher.notify import notify_dispatcher
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Expired leases requeued per statement
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", "5000"))
+
+
+def requeue_expired_leases(db, now: datetime) -> list[tuple[int, int]]:
+    """
+    Move IN_PROGRESS tasks whose lease expired before ``now`` back to PENDING.
+
+    Reads ix_email_tasks_in_progress_lease a bounded batch at a time; the
+    status check in the UPDATE leaves alone a task its sender finished in
+    the meantime. Returns ``(task_id, job_id)`` pairs.
+    """
+    requeued = []
+    while True:
+        expired = (
+            select(EmailTask.id)
+            .where(
+                EmailTask.status == EmailTaskStatus.IN_PROGRESS,
+                EmailTask.lease_expires_at < now,
+            )
+            .limit(REAPER_BATCH_SIZE)
+        )
+        rows = db.execute(
+            update(EmailTask)
+            .where(
+                EmailTask.id.in_(expired),
+                EmailTask.status == EmailTaskStatus.IN_PROGRESS,
+            )
+            .values(
+                status=EmailTaskStatus.PENDING,
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(EmailTask.id, EmailTask.job_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if rows:
+            # a retried batch can outlive its job being marked COMPLETED
+            db.execute(
+                update(EmailJob)
+                .where(
+                    EmailJob.id.in_({row.job_id for row in rows}),
+                    EmailJob.status == EmailJobStatus.COMPLETED,
+                )
+                .values(status=EmailJobStatus.RUNNING)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        requeued.extend((row.id, row.job_id) for row in rows)
+        if len(rows) < REAPER_BATCH_SIZE:
+            return requeued
+
+
+@celery_app.task(name="tasks.reap_expired_leases")
+def reap_expired_leases():
+    """
+    Requeue tasks stuck IN_PROGRESS by a lost message or a crashed sender.
+
+    The dispatcher claims them again like any PENDING task; senders only
+    take tasks nobody holds, so the original message showing up late does
+    not send them twice.
+    """
+    with get_sync_db() as db:
+        requeued = requeue_expired_leases(db, datetime.utcnow())
+
+    if not requeued:
+        return
+
+    logger.warning(
+        "[REAPER] Requeued %d tasks with expired leases across jobs %s",
+        len(requeued),
+        sorted({job_id for _, job_id in requeued}),
+    )
+    notify_dispatcher("tasks_requeued")
@@ -0,0 +1,143 @@
+# tasks/materialize.py
+
+import logging
+import os
+from datetime import datetime
+from celery_app import celery_app
+from sqlalchemy import func, insert, select
+from db.db_connection import get_sync_db
+from db.db_models import (
+    Dataset,
+    DatasetRow,
+    EmailJob,
+    EmailJobStatus,
+    EmailTask,
+    EmailTaskStatus,
+)
+from services.templates import compile_template, render_chunk
+from dispatcher.notify import notify_dispatcher
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# DatasetRows rendered and inserted as EmailTasks per transaction
+MATERIALIZE_CHUNK_SIZE = int(os.getenv("MATERIALIZE_CHUNK_SIZE", "5000"))
+
+
+@celery_app.task(
+    name="tasks.materialize_email_job",
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def materialize_email_job(job_id: int):
+    """
+    Create the EmailTasks of a job from its dataset, one chunk at a time.
+
+    Dataset rows are read in keyset-paginated chunks (``id > last id``),
+    rendered column-wise and bulk inserted, and every chunk is committed on
+    its own so the dispatcher can start sending while later chunks are
+    produced and memory stays flat whatever the dataset size. A redelivered task
+    resumes after the last dataset row that already has a task.
+    """
+    with get_sync_db() as db:
+        job = db.get(EmailJob, job_id)
+        if job is None or job.materialized_at is not None:
+            return
+
+        dataset = db.get(Dataset, job.dataset_id)
+        body_template = compile_template(job.prompt_template)
+        subject_template = compile_template(job.subject_template)
+
+        last_row_id = db.execute(
+            select(func.max(EmailTask.dataset_row_id))
+            .where(EmailTask.job_id == job_id)
+        ).scalar() or 0
+
+        logger.info(
+            "[MATERIALIZE] Job %s starting after dataset row %s",
+            job_id,
+            last_row_id,
+        )
+
+        while True:
+            rows = db.execute(
+                select(DatasetRow.id, DatasetRow.row_data)
+                .where(
+                    DatasetRow.dataset_id == dataset.id,
+                    DatasetRow.id > last_row_id,
+                )
+                .order_by(DatasetRow.id)
+                .limit(MATERIALIZE_CHUNK_SIZE)
+            ).all()
+
+            if not rows:
+                break
+
+            last_row_id = rows[-1].id
+
+            # rows without an email are skipped
+            columns = dataset.decode_columns([row.row_data for row in rows])
+            recipients = columns.get(dataset.email_column) or [None] * len(rows)
+            keep = [index for index, recipient in enumerate(recipients) if recipient]
+            if len(keep) < len(rows):
+                columns = {
+                    name: [values[index] for index in keep]
+                    for name, values in columns.items()
+                }
+            row_ids = [rows[index].id for index in keep]
+            recipients = [recipients[index].strip() for index in keep]
+
+            if job.lazy_render:
+                # lazy jobs are rendered by the sender from dataset_row_id
+                subjects = bodies = [None] * len(keep)
+            else:
+                subjects, bodies = render_chunk(
+                    subject_template, body_template, columns, len(keep)
+                )
+
+            task_rows = [
+                {
+                    "job_id": job.id,
+                    "dataset_row_id": row_id,
+                    "recipient_email": recipient,
+                    "status": EmailTaskStatus.PENDING,
+                    "rendered_body": body,
+                    "rendered_subject": subject,
+                }
+                for row_id, recipient, subject, body in zip(
+                    row_ids, recipients, subjects, bodies
+                )
+            ]
+
+            if task_rows:
+                db.execute(insert(EmailTask), task_rows)
+            db.commit()
+            if task_rows:
+                notify_dispatcher("tasks_materialized")
+
+            logger.info(
+                "[MATERIALIZE] Job %s: %d tasks up to dataset row %s",
+                job_id,
+                len(task_rows),
+                last_row_id,
+            )
+
+        total_tasks = db.execute(
+            select(func.count())
+            .select_from(EmailTask)
+            .where(EmailTask.job_id == job_id)
+        ).scalar()
+
+        if total_tasks == 0:
+            logger.error(
+                "[MATERIALIZE] Job %s: no valid recipient emails found in dataset",
+                job_id,
+            )
+            job.status = EmailJobStatus.FAILED
+
+        job.materialized_at = datetime.utcnow()
+        db.commit()
+
+    logger.info("[MATERIALIZE] Job %s done, %d tasks", job_id, total_tasks)
@@ -1,70 +1,319 @@
-from db.db_connection import AsyncSessionLocal
-import aiofiles, csv, io, os
-from db.db_models import Dataset, DatasetRow, DatasetStatus
-from sqlalchemy import select
-from typing import Optional
+# tasks/process_csv.py
 
-async def process_csv_background(file_path: str, dataset_id: int):
-    batch_size = 1000
-    rows_buffer = []
-    total_rows = 0
+import csv, io, json, logging, os
+from datetime import datetime
+from celery import chord
+from celery_app import celery_app
+from db.db_connection import get_sync_db
+from db.db_models import Dataset, DatasetIngestChunk, DatasetRow, DatasetStatus
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
 
-    async with AsyncSessionLocal() as db:
-        dataset: Optional[Dataset] = None
+load_dotenv()
 
-        try:
-            result = await db.execute(
-                select(Dataset).where(Dataset.id == dataset_id)
+logger = logging.getLogger(__name__)
+
+# Bytes of CSV handled by one tasks.ingest_dataset_chunk
+CSV_CHUNK_BYTES = int(os.getenv("CSV_CHUNK_BYTES", str(16 * 1024 * 1024)))
+# Rows per INSERT/COPY inside a chunk
+CSV_BATCH_SIZE = 5000
+CSV_SCAN_BLOCK = 1024 * 1024
+# Retries of a chunk that hit a transient database error (lost
+# connection, lock timeout, deadlock) before the dataset is failed
+CSV_CHUNK_MAX_RETRIES = int(os.getenv("CSV_CHUNK_MAX_RETRIES", "3"))
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def plan_chunks(file_path: str, data_start: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """
+    Split the data section of a CSV into ``(start, end)`` byte ranges of about ``chunk_bytes``.
+
+    Ranges always end right after a newline that is outside a quoted
+    field, so every range holds whole records and can be parsed on its
+    own. Quote parity is tracked with ``bytes.count`` per block rather
+    than byte by byte; escaped quotes ("") keep the parity unchanged.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [data_start]
+    target = data_start + chunk_bytes
+    in_quotes = False
+    block_pos = data_start
+
+    with open(file_path, "rb") as f:
+        f.seek(data_start)
+        while target < size and (block := f.read(CSV_SCAN_BLOCK)):
+            offset = 0
+            while offset < len(block):
+                if block_pos + offset < target:
+                    stop = min(len(block), target - block_pos)
+                    in_quotes ^= block.count(b'"', offset, stop) % 2 == 1
+                    offset = stop
+                    continue
+
+                newline = block.find(b"\n", offset)
+                if newline == -1:
+                    in_quotes ^= block.count(b'"', offset) % 2 == 1
+                    break
+
+                in_quotes ^= block.count(b'"', offset, newline) % 2 == 1
+                offset = newline + 1
+                if not in_quotes:
+                    boundaries.append(block_pos + offset)
+                    target = block_pos + offset + chunk_bytes
+
+            block_pos += len(block)
+
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def insert_dataset_rows(db: Session, dataset_id: int, rows: list[dict | list]):
+    """
+    Insert a batch of DatasetRows below the ORM unit of work.
+
+    PostgreSQL (psycopg) gets a COPY; every other backend gets a single
+    executemany of a Core INSERT.
+    """
+    conn = db.connection()
+
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+        cursor = conn.connection.driver_connection.cursor()
+        with cursor.copy(
+            f"COPY {DatasetRow.__tablename__} (dataset_id, row_data) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row((dataset_id, json.dumps(row)))
+        return
+
+    conn.execute(
+        insert(DatasetRow.__table__),
+        [{"dataset_id": dataset_id, "row_data": row} for row in rows],
+    )
+
+
+def _parse_records(text: str, width: int):
+    """Yield each record as a list of ``width`` stripped values, padded or truncated."""
+    for values in csv.reader(io.StringIO(text, newline="")):
+        if not values:
+            continue
+        values += [""] * (width - len(values))
+        yield [value.strip() for value in values[:width]]
+
+
+@celery_app.task(name="tasks.ingest_dataset")
+def ingest_dataset(file_path: str, dataset_id: int):
+    """
+    Plan an uploaded CSV into chunks and fan them out to worker tasks.
+
+    Safe to run again for the same dataset: chunks are planned once and
+    only the ones not yet completed are dispatched, which is how an
+    ingestion interrupted by a dead worker is resumed.
+    """
+    with get_sync_db() as db:
+        dataset = db.get(Dataset, dataset_id)
+        if dataset is None:
+            return
+
+        chunks = db.execute(
+            select(DatasetIngestChunk)
+            .where(DatasetIngestChunk.dataset_id == dataset_id)
+            .order_by(DatasetIngestChunk.chunk_index)
+        ).scalars().all()
+
+        if not chunks:
+            with open(file_path, "rb") as f:
+                f.readline()  # header, already validated by upload_csv
+                data_start = f.tell()
+
+            chunks = [
+                DatasetIngestChunk(
+                    dataset_id=dataset_id,
+                    chunk_index=index,
+                    start_offset=start,
+                    end_offset=end,
+                )
+                for index, (start, end) in enumerate(
+                    plan_chunks(file_path, data_start, CSV_CHUNK_BYTES)
+                )
+            ]
+            db.add_all(chunks)
+            db.commit()
+
+        pending = [chunk.chunk_index for chunk in chunks if chunk.completed_at is None]
+
+    logger.info(
+        "[INGEST] Dataset %s: %d chunks, %d pending",
+        dataset_id,
+        len(chunks),
+        len(pending),
+    )
+
+    finalize = finalize_dataset_ingest.si(file_path, dataset_id)
+    if not pending:
+        finalize.delay()
+        return
+
+    chord(
+        ingest_dataset_chunk.si(file_path, dataset_id, chunk_index)
+        for chunk_index in pending
+    )(finalize)
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.ingest_dataset_chunk",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=CSV_CHUNK_MAX_RETRIES,
+)
+def ingest_dataset_chunk(self, file_path: str, dataset_id: int, chunk_index: int):
+    """
+    Parse and insert one chunk in a single transaction.
+
+    The task is acknowledged only after it finishes, so a chunk whose
+    worker died is redelivered; a chunk that already completed is skipped.
+    Transient database errors are retried; anything else fails the
+    dataset. The chunk only commits while the dataset is not FAILED, so
+    a sibling chunk failing meanwhile leaves no orphan rows behind.
+    """
+    with get_sync_db() as db:
+        dataset = db.get(Dataset, dataset_id)
+        chunk = db.execute(
+            select(DatasetIngestChunk).where(
+                DatasetIngestChunk.dataset_id == dataset_id,
+                DatasetIngestChunk.chunk_index == chunk_index,
             )
-            dataset = result.scalar_one_or_none()
+        ).scalar_one_or_none()
+
+        if dataset is None or chunk is None or dataset.dataset_status == DatasetStatus.FAILED:
+            return
+        if chunk.completed_at is not None:
+            return
 
-            if dataset is None:
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(chunk.start_offset)
+                text = f.read(chunk.end_offset - chunk.start_offset).decode("utf-8")
+
+            total_rows = 0
+            batch = []
+            for values in _parse_records(text, len(dataset.json_schema)):
+                batch.append(dataset.encode_row(values))
+                if len(batch) >= CSV_BATCH_SIZE:
+                    insert_dataset_rows(db, dataset_id, batch)
+                    total_rows += len(batch)
+                    batch = []
+            if batch:
+                insert_dataset_rows(db, dataset_id, batch)
+                total_rows += len(batch)
+
+            chunk.rows = total_rows
+            chunk.completed_at = datetime.utcnow()
+            # locks the dataset row, so this either commits before
+            # _fail_dataset deletes the rows or sees the FAILED status
+            counted = db.execute(
+                update(Dataset)
+                .where(
+                    Dataset.id == dataset_id,
+                    Dataset.dataset_status != DatasetStatus.FAILED,
+                )
+                .values(processed_rows=Dataset.processed_rows + total_rows)
+            ).rowcount
+            if not counted:
+                db.rollback()
+                logger.info(
+                    "[INGEST] Dataset %s failed meanwhile, dropping chunk %s",
+                    dataset_id,
+                    chunk_index,
+                )
                 return
+            db.commit()
 
-            # load file once (safe version)
-            async with aiofiles.open(file_path, "r") as f:
-                content = await f.read()
+        except TRANSIENT_ERRORS as exc:
+            db.rollback()
+            if self.request.retries < self.max_retries:
+                logger.warning(
+                    "[INGEST] Dataset %s chunk %s hit a transient error, retry %d/%d",
+                    dataset_id,
+                    chunk_index,
+                    self.request.retries + 1,
+                    self.max_retries,
+                )
+                raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+            logger.exception(
+                "[INGEST] Dataset %s chunk %s failed",
+                dataset_id,
+                chunk_index,
+            )
+            _fail_dataset(db, dataset_id, file_path)
+            raise
 
-            reader = csv.DictReader(io.StringIO(content))
+        except Exception:
+            db.rollback()
+            logger.exception(
+                "[INGEST] Dataset %s chunk %s failed",
+                dataset_id,
+                chunk_index,
+            )
+            _fail_dataset(db, dataset_id, file_path)
+            raise
 
-            if not reader.fieldnames:
-                raise Exception("CSV missing header")
+    logger.info(
+        "[INGEST] Dataset %s chunk %s: %d rows",
+        dataset_id,
+        chunk_index,
+        total_rows,
+    )
 
-            for row in reader:
-                cleaned = {
-                    k.strip(): (v.strip() if v else "")
-                    for k, v in row.items()
-                }
 
-                rows_buffer.append(
-                    DatasetRow(dataset_id=dataset_id, row_data=cleaned)
-                )
+@celery_app.task(name="tasks.finalize_dataset_ingest")
+def finalize_dataset_ingest(file_path: str, dataset_id: int):
+    with get_sync_db() as db:
+        dataset = db.get(Dataset, dataset_id)
+        if dataset is None:
+            return
 
-                if len(rows_buffer) >= batch_size:
-                    db.add_all(rows_buffer)
-                    await db.flush()
-                    total_rows += len(rows_buffer)
-                    rows_buffer = []
+        pending, total_rows = db.execute(
+            select(
+                func.count().filter(DatasetIngestChunk.completed_at.is_(None)),
+                func.coalesce(func.sum(DatasetIngestChunk.rows), 0),
+            ).where(DatasetIngestChunk.dataset_id == dataset_id)
+        ).one()
+
+        if pending:
+            logger.warning(
+                "[INGEST] Dataset %s finalized with %d chunks pending, leaving it PROCESSING",
+                dataset_id,
+                pending,
+            )
+            return
 
-            if rows_buffer:
-                db.add_all(rows_buffer)
-                total_rows += len(rows_buffer)
+        if total_rows == 0:
+            logger.error("[INGEST] Dataset %s: CSV had no rows", dataset_id)
+            _fail_dataset(db, dataset_id, file_path)
+            return
 
-            if total_rows == 0:
-                raise Exception("CSV had no rows")
-            dataset.processed_rows = total_rows
-            dataset.dataset_status = DatasetStatus.COMPLETED
-            await db.commit()
+        dataset.processed_rows = total_rows
+        dataset.dataset_status = DatasetStatus.COMPLETED
+        db.commit()
 
-        except Exception as e:
-            await db.rollback()
+    if os.path.exists(file_path):
+        os.remove(file_path)
 
-            if dataset is not None:
-                dataset.dataset_status = DatasetStatus.FAILED
-                await db.commit()
 
-            print("CSV processing failed:", e)
+def _fail_dataset(db: Session, dataset_id: int, file_path: str):
+    # mark FAILED first: chunks committing afterwards see it and roll
+    # back, and the DELETE sees the rows of those that committed before
+    db.execute(
+        update(Dataset)
+        .where(Dataset.id == dataset_id)
+        .values(processed_rows=0, dataset_status=DatasetStatus.FAILED)
+    )
+    db.execute(delete(DatasetRow).where(DatasetRow.dataset_id == dataset_id))
+    db.commit()
 
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
\ No newline at end of file
+    if os.path.exists(file_path):
+        os.remove(file_path)
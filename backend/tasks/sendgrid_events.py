@@ -0,0 +1,71 @@
+# tasks/sendgrid_events.py
+
+import logging
+from celery_app import celery_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from analytics.base import count_events
+from analytics.factory import record_job_counts
+from db.db_connection import get_sync_db
+from services.sendgrid_events import (
+    EventBatchPlan,
+    event_ids,
+    event_task_id,
+    load_tasks_query,
+    plan_events,
+    seen_event_ids_query,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def apply_sendgrid_events(db: Session, events: list) -> EventBatchPlan:
+    """Record a batch of SendGrid events with a handful of set-based statements."""
+    task_ids = {task_id for event in events if (task_id := event_task_id(event))}
+    if not task_ids:
+        return EventBatchPlan()
+
+    tasks = {row.id: row for row in db.execute(load_tasks_query(task_ids)).all()}
+
+    provider_event_ids = event_ids(events)
+    seen = set()
+    if provider_event_ids:
+        seen = set(db.execute(seen_event_ids_query(provider_event_ids)).scalars())
+
+    plan = plan_events(events, tasks, seen)
+    for statement, params in plan.statements():
+        db.execute(statement, params)
+    return plan
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.ingest_sendgrid_events",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=5,
+)
+def ingest_sendgrid_events(self, events: list):
+    """
+    Consumer of webhook batches queued by ``sendgrid_webhook`` in queue mode.
+
+    Events already recorded are skipped by sg_event_id, so a batch that is
+    redelivered, or raced by another consumer into the unique index, is
+    simply retried.
+    """
+    with get_sync_db() as db:
+        try:
+            plan = apply_sendgrid_events(db, events)
+            db.commit()
+        except IntegrityError as exc:
+            db.rollback()
+            raise self.retry(exc=exc, countdown=1)
+
+    record_job_counts(count_events(plan.recorded))
+
+    logger.info(
+        "[WEBHOOK] Ingested %d of %d events, %d status changes",
+        len(plan.event_rows),
+        len(events),
+        sum(len(task_ids) for task_ids in plan.status_updates.values()),
+    )
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+from cryptography.fernet import Fernet
+
+# settings are read at import time, so they have to be in place before
+# anything from the app is imported; tests never touch the .env database
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}",
+)
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ["RATE_LIMITER_BACKEND"] = "memory"
+os.environ["ANALYTICS_BUFFER_BACKEND"] = "memory"
+os.environ["DISPATCHER_MODE"] = "beat"
+
+import pytest
+from sqlalchemy import insert
+
+import rate_limiters.factory
+from celery_app import celery_app
+from db.db_connection import SyncSessionLocal, sync_engine
+from db.db_models import (
+    Base,
+    Dataset,
+    DatasetRow,
+    EmailAccount,
+    EmailJob,
+    EmailJobStatus,
+    EmailProvider,
+    EmailTask,
+    SourceType,
+    User,
+)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(sync_engine)
+    session = SyncSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(sync_engine)
+
+
+@pytest.fixture(autouse=True)
+def limiter():
+    """A fresh in-memory rate limiter per test."""
+    rate_limiters.factory._limiter = None
+    yield rate_limiters.factory.get_rate_limiter()
+    rate_limiters.factory._limiter = None
+
+
+@pytest.fixture
+def sent_tasks(monkeypatch):
+    """Records ``celery_app.send_task`` calls as ``(name, args, options)``."""
+    sent = []
+    monkeypatch.setattr(
+        celery_app,
+        "send_task",
+        lambda name, args=None, **options: sent.append((name, args, options)),
+    )
+    return sent
+
+
+@pytest.fixture
+def seed(db):
+    """
+    Create a user with one sending account and ``jobs`` jobs of ``tasks``
+    PENDING tasks each; returns the jobs. Pass ``user``/``account`` to
+    add jobs to existing tenants.
+    """
+    def make(
+        jobs=1,
+        tasks=10,
+        throttle=60,
+        provider=EmailProvider.SENDGRID,
+        user=None,
+        account=None,
+        **job_fields,
+    ):
+        if user is None:
+            user = User(id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+        if account is None:
+            account = EmailAccount(
+                provider=provider,
+                user_id=user.id,
+                email_address=f"{uuid.uuid4()}@example.com",
+                config={"api_key": "key"},
+            )
+            db.add(account)
+            db.flush()
+
+        dataset = Dataset(
+            source_type=SourceType.CSV,
+            name="recipients",
+            user_id=user.id,
+            json_schema=["email"],
+            email_column="email",
+        )
+        db.add(dataset)
+        db.flush()
+        row_ids = db.execute(
+            insert(DatasetRow).returning(DatasetRow.id),
+            [{"dataset_id": dataset.id, "row_data": {"email": f"r{i}@example.com"}} for i in range(tasks)],
+        ).scalars().all() if tasks else []
+
+        job_fields.setdefault("status", EmailJobStatus.RUNNING)
+        job_fields.setdefault("materialized_at", datetime.utcnow())
+        created = [
+            EmailJob(
+                dataset_id=dataset.id,
+                user_id=user.id,
+                email_account_id=account.id,
+                prompt_template="hi",
+                subject_template="hello",
+                throttle_per_minute=throttle,
+                **job_fields,
+            )
+            for _ in range(jobs)
+        ]
+        db.add_all(created)
+        db.flush()
+        if tasks:
+            db.execute(insert(EmailTask), [
+                {
+                    "job_id": job.id,
+                    "dataset_row_id": row_id,
+                    "recipient_email": f"r{i}@example.com",
+                    "rendered_subject": "hello",
+                    "rendered_body": "hi",
+                }
+                for job in created
+                for i, row_id in enumerate(row_ids)
+            ])
+        db.commit()
+        return created
+
+    return make
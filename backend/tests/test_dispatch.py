@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from db.db_models import EmailProvider, EmailTask, EmailTaskStatus
+from tasks.email_tasks import claim_pending_tasks, pending_demand, run_dispatch
+
+
+def test_pending_heads_past_sqlite_compound_select_limit(db, seed):
+    # more jobs than SQLite allows terms in one UNION ALL
+    jobs = seed(jobs=550, tasks=3)
+
+    assert pending_demand(db, {job.id: 2 for job in jobs}) == {job.id: 2 for job in jobs}
+
+    claimed = claim_pending_tasks(db, {job.id: 2 for job in jobs})
+    db.commit()
+
+    assert len(claimed) == 2 * len(jobs)
+    first_tasks = db.execute(
+        select(EmailTask.id, EmailTask.job_id)
+        .where(EmailTask.id.in_([task_id for task_id, _ in claimed]))
+    ).all()
+    per_job = {}
+    for task_id, job_id in first_tasks:
+        per_job.setdefault(job_id, []).append(task_id)
+    for job_id, task_ids in per_job.items():
+        pending = db.execute(
+            select(func.min(EmailTask.id)).where(
+                EmailTask.job_id == job_id,
+                EmailTask.status == EmailTaskStatus.PENDING,
+            )
+        ).scalar()
+        assert max(task_ids) < pending
+
+
+def test_run_dispatch_claims_for_every_job_past_batch_size(db, seed, sent_tasks):
+    jobs = seed(jobs=520, tasks=2, provider=EmailProvider.GMAIL)
+
+    result = run_dispatch(datetime.utcnow())
+
+    assert result.eligible_jobs == len(jobs)
+    assert result.claimed == 2 * len(jobs)
+    assert sum(len(args[0]) for _, args, _ in sent_tasks) == 2 * len(jobs)